@@ -0,0 +1,272 @@
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from file_cache import FileCache
+from hashing import hash_file
+
+CACHE_VERSION = 2  # 2: entry names include a hash of the image's path
+CACHE_HEADER = struct.Struct("<8sII4s")  # magic, width, height, pixel format of the raw buffer that follows
+CACHE_MAGIC = b"FQLPIXEL"
+
+_mixer_lock = threading.Lock()
+
+
+def _init_mixer():
+    with _mixer_lock:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
+
+class Asset:
+    def __init__(self, future, finish=None):
+        """
+        A handle to an asset that is loading in the background.
+
+        Args:
+            future (concurrent.futures.Future): Resolves to the decoded asset.
+            finish (callable): Applied once to the decoded asset on the thread that first
+                uses it, e.g. to convert a surface to the display format.
+        """
+        self.future = future
+        self.finish = finish
+        self.value = None
+        self.resolved = False
+
+    def ready(self):
+        """
+        Check whether the asset finished loading (or failed to). Never blocks.
+        """
+        return self.resolved or self.future.done()
+
+    def get(self):
+        """
+        Get the asset, waiting for it if it is still loading.
+
+        Returns:
+            The asset.
+
+        Raises:
+            Whatever loading it raised, e.g. FileNotFoundError or pygame.error.
+        """
+        if not self.resolved:
+            value = self.future.result()
+            self.value = self.finish(value) if self.finish else value
+            self.resolved = True
+        return self.value
+
+    def peek(self, default=None):
+        """
+        Get the asset if it has loaded, without waiting.
+
+        Args:
+            default: Returned while the asset is loading, or if it failed to load.
+        """
+        if not self.ready() or self.future.exception() is not None:
+            return default
+        return self.get()
+
+
+class SoundAsset(Asset):
+    def play(self, *args, **kwargs):
+        """
+        Play the sound if it has loaded; before that, this does nothing.
+        """
+        sound = self.peek()
+        if sound is not None:
+            sound.play(*args, **kwargs)
+
+
+class ScaledImageCache:
+    def __init__(self, directory):
+        """
+        An on-disk cache of decoded, scaled images as raw pixel buffers.
+
+        Entries are keyed by the source file's digest, the target size and
+        the pixel format, and are read back through `mmap` with
+        `pygame.image.frombuffer`, skipping the PNG decode and the resample.
+        A source image that changes (or a new target size) simply misses,
+        and the stale entry for that image (the same resolved path) is
+        deleted when the new one is written. Source digests are remembered by (path, size, mtime), so
+        unchanged images are not even hashed.
+
+        Args:
+            directory (str): Where to keep the entries.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.digests = FileCache(os.path.join(directory, "sources.json"), version=CACHE_VERSION)
+        if not len(self.digests):
+            # A new cache, or one from another version whose entries are named differently and
+            # would never be pruned: start from an empty folder
+            for name in os.listdir(directory):
+                if name.endswith(".pix"):
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError:
+                        pass
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _digest(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.lock:
+            digest = self.digests.get(path, stat.st_size, stat.st_mtime_ns)
+        if digest is None:
+            digest = hash_file(path)
+            with self.lock:
+                self.digests.put(path, stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def _entry_prefix(self, path, pixel_format):
+        # The file name keeps entries readable; the path hash keeps same-named images in different folders apart
+        path_hash = hashlib.sha1(os.path.normcase(os.path.realpath(path)).encode()).hexdigest()[:8]
+        return re.sub(r"[^\w.-]", "_", os.path.basename(path)) + f"-{path_hash}-{pixel_format}-"
+
+    def load(self, path, size, alpha):
+        """
+        Get an image as a surface, from the cache or by decoding (and caching) it.
+
+        Args:
+            path (str): Path to the image file.
+            size (tuple): Target size (width, height), or None for the image's own size.
+            alpha (bool): Whether to keep per-pixel alpha.
+
+        Returns:
+            pygame.Surface: The scaled image, not yet in the display format.
+        """
+        pixel_format = "RGBA" if alpha else "RGB"
+        target = f"{size[0]}x{size[1]}" if size else "source"
+        prefix = self._entry_prefix(path, pixel_format)
+        entry_name = f"{prefix}{target}-{self._digest(path)[:24]}.pix"
+        entry = os.path.join(self.directory, entry_name)
+
+        try:
+            with open(entry, "rb") as entry_file:
+                buffer = mmap.mmap(entry_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, width, height, stored_format = CACHE_HEADER.unpack_from(buffer)
+            if magic == CACHE_MAGIC and stored_format.rstrip(b"\0").decode() == pixel_format:
+                self.hits += 1
+                # The surface reads the mapped pixels directly; the mapping lives as long as it does
+                return pygame.image.frombuffer(memoryview(buffer)[CACHE_HEADER.size:], (width, height), pixel_format)
+        except (OSError, ValueError, struct.error):
+            pass  # Missing or unreadable entry
+
+        self.misses += 1
+        surface = pygame.image.load(path)
+        if size:
+            surface = pygame.transform.scale(surface, size)
+
+        # Write the new entry and drop the ones for older versions or sizes of this image
+        try:
+            temporary_entry = entry + f".{threading.get_ident()}.tmp"
+            with open(temporary_entry, "wb") as entry_file:
+                entry_file.write(CACHE_HEADER.pack(CACHE_MAGIC, *surface.get_size(), pixel_format.encode()))
+                entry_file.write(pygame.image.tobytes(surface, pixel_format))
+            os.replace(temporary_entry, entry)
+            for name in os.listdir(self.directory):
+                if name.startswith(prefix) and name.endswith(".pix") and name != entry_name:
+                    os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass  # The cache is best effort: read-only folder, or an entry still mapped elsewhere (Windows)
+        return surface
+
+    def save(self):
+        """
+        Write the source digests to disk.
+        """
+        with self.lock:
+            self.digests.save()
+
+
+class AssetLoader:
+    def __init__(self, max_workers=4, cache_directory=None):
+        """
+        Decode images and sounds on a background thread pool.
+
+        Requests return handles right away, so the caller keeps initializing
+        (and drawing) while files are read and decoded. Surfaces are only
+        converted to the display format when first used, on the thread that
+        uses them, since that needs the display mode to be set.
+
+        Args:
+            max_workers (int): Number of loading threads.
+            cache_directory (str): Folder for the ScaledImageCache, or None to always decode images.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-loader")
+        self.image_cache = ScaledImageCache(cache_directory) if cache_directory else None
+
+    def image(self, path, size=None, alpha=False):
+        """
+        Load an image.
+
+        Args:
+            path (str): Path to the image file.
+            size (tuple): Scale the image to this size (width, height), or None to keep it.
+            alpha (bool): Whether the image has per-pixel alpha (convert_alpha instead of convert).
+
+        Returns:
+            Asset: Resolves to the display-format surface.
+        """
+        def load():
+            if self.image_cache:
+                return self.image_cache.load(path, size, alpha)
+            surface = pygame.image.load(path)
+            return pygame.transform.scale(surface, size) if size else surface
+
+        return Asset(self.executor.submit(load), finish=lambda surface: surface.convert_alpha() if alpha else surface.convert())
+
+    def sound(self, path, volume=1.0):
+        """
+        Load a sound effect.
+
+        Args:
+            path (str): Path to the sound file.
+            volume (float): Volume to play it at (0.0 to 1.0).
+
+        Returns:
+            SoundAsset: Resolves to the pygame.mixer.Sound; `play()` can be called right away.
+        """
+        def load():
+            _init_mixer()
+            sound = pygame.mixer.Sound(path)
+            sound.set_volume(volume)
+            return sound
+
+        return SoundAsset(self.executor.submit(load))
+
+    def music(self, path, volume=1.0, loops=-1):
+        """
+        Load the background music and start playing it as soon as it is loaded.
+
+        Args:
+            path (str): Path to the music file.
+            volume (float): Music volume (0.0 to 1.0).
+            loops (int): Number of repeats, -1 to loop indefinitely.
+
+        Returns:
+            Asset: Resolves to None once the music is playing.
+        """
+        def load():
+            _init_mixer()
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(loops)
+
+        return Asset(self.executor.submit(load))
+
+    def shutdown(self):
+        """
+        Stop the loading threads, dropping anything not started yet, and save the image cache index.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.image_cache:
+            self.image_cache.save()
@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout clean for the JSON output
+
+BENCHMARK_SIZES = (327, 10_000, 100_000)  # Catalog sizes: the real list, a big modpack, a stress test
+BENCHMARK_FRAMES = 300  # Frames rendered per run
+WARMUP_FRAMES = 30  # Frames left out of the steady-state numbers
+BENCHMARK_QUERY = "sodium extra"  # Typed one key at a time, then erased
+REGRESSION_TOLERANCE = 0.25  # Slowdown relative to the baseline that counts as a regression
+REGRESSION_FLOOR = 0.1  # Smallest absolute increase that counts, so noise on tiny timings doesn't
+
+# Building blocks for synthetic mod names
+NAME_WORDS = [
+    "Sodium", "Iris", "Better", "Extra", "Create", "Farmers", "Delight", "Cloth", "Config", "Mod", "Menu",
+    "Dynamic", "Lights", "Structures", "Nether", "End", "Ocean", "Biomes", "Trees", "Storage", "Backpacks",
+    "Chunk", "Loader", "Fast", "Smooth", "Sound", "Physics", "Armor", "Tools", "Villager", "Quests",
+]
+LOADERS = ["fabric", "forge", "neoforge", "quilt"]
+MC_VERSIONS = ["1.20.1", "1.20.4", "1.19.2", "1.21"]
+
+
+def generate_catalog(count, directory, seed=0):
+    """
+    Write a synthetic catalog in the format of the mod names and mod jar files.
+
+    Args:
+        count (int): Number of mods.
+        directory (str): Where to write the files.
+        seed (int): Seed, so every run gets the same catalog.
+
+    Returns:
+        tuple: (names_filepath, jars_filepath).
+    """
+    rng = random.Random(seed)
+    names, jars = [], []
+    for i in range(count):
+        name = " ".join(rng.sample(NAME_WORDS, rng.randint(1, 3)))
+        slug = name.lower().replace(" ", "-")
+        version = f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 99)}"
+        jars.append(f"{slug}-{rng.choice(LOADERS)}-{version}+{rng.choice(MC_VERSIONS)}-{i}.jar")
+        names.append(name)
+
+    names_filepath = os.path.join(directory, f"mod_names_{count}.txt")
+    jars_filepath = os.path.join(directory, f"mod_jar_{count}.txt")
+    with open(names_filepath, "w") as names_file, open(jars_filepath, "w") as jars_file:
+        names_file.write("\n".join(names))
+        jars_file.write("\n".join(jars))
+    return names_filepath, jars_filepath
+
+
+def peak_rss_mb():
+    """
+    Get the peak resident memory of this process in MB.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+                )
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return counters.PeakWorkingSetSize / 2 ** 20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # Bytes on macOS, KB elsewhere
+
+
+def summarize(samples):
+    """
+    Summarize timings in seconds as milliseconds.
+    """
+    if not samples:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "mean": round(1000 * statistics.fmean(ordered), 3),
+        "p50": round(1000 * ordered[len(ordered) // 2], 3),
+        "p95": round(1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(1000 * ordered[-1], 3),
+    }
+
+
+class StageTimer:
+    def __init__(self):
+        """
+        Accumulate the time spent in wrapped functions, per stage and per frame.
+        """
+        self.current = {}  # stage -> seconds in the current frame
+        self.frames = []  # One {stage: seconds} dict per finished frame
+
+    def wrap(self, owner, name, stage):
+        """
+        Replace owner.name with a version that adds its run time to a stage.
+        """
+        original = getattr(owner, name)
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.current[stage] = self.current.get(stage, 0.0) + perf_counter() - start
+
+        setattr(owner, name, timed)
+
+    def end_frame(self, total):
+        """
+        Close the current frame, recording its total wall time.
+        """
+        self.current["total"] = total
+        self.frames.append(self.current)
+        self.current = {}
+
+
+def run_child(names_filepath, jars_filepath, snapshot_filepath, frames):
+    """
+    Run the app headlessly against one catalog and print the measurements as JSON.
+
+    Runs in its own process, so startup is cold and the peak RSS belongs to this catalog alone.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    startup_start = time.perf_counter()
+
+    import pygame
+    import main as app
+    from particles import ParticleSystem
+    from search import ModSearch
+    from snapshot import open_snapshot
+    from ui_elements import Button, SearchBar
+
+    timer = StageTimer()
+    timer.wrap(ParticleSystem, "update", "particles")
+    timer.wrap(ParticleSystem, "draw", "particles")
+    timer.wrap(Button, "draw", "buttons")
+    timer.wrap(SearchBar, "draw", "search_bar")
+    timer.wrap(pygame.display, "update", "flip")
+    timer.wrap(pygame.display, "flip", "flip")
+
+    # The dummy video driver has no real pointer, so keep a virtual one
+    mouse = [(289, 400)]
+    pygame.mouse.get_pos = lambda: mouse[0]
+
+    def click(pos):
+        mouse[0] = pos
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=pos))
+
+    # Scripted session: open and focus the search bar, type and erase the query,
+    # and keep flinging the list so every frame has work to do
+    script = {2: lambda: click((100, 50))}  # The icon sits inside the bar, so this also focuses it
+    for i, char in enumerate(BENCHMARK_QUERY):
+        script[10 + 4 * i] = lambda char=char: pygame.event.post(
+            pygame.event.Event(pygame.KEYDOWN, key=ord(char), unicode=char, mod=0))
+    for i in range(len(BENCHMARK_QUERY)):
+        script[120 + 4 * i] = lambda: pygame.event.post(
+            pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode="", mod=0))
+
+    state = {"first_frame": None, "last": None}
+
+    def on_frame(frame):
+        now = time.perf_counter()
+        if state["first_frame"] is None:
+            state["first_frame"] = now - startup_start
+        else:
+            timer.end_frame(now - state["last"])
+        timer.current = {}
+        state["last"] = now
+
+        if frame in script:
+            script[frame]()
+        if frame % 8 == 0:
+            mouse[0] = (289, 300 + (frame * 7) % 400)  # Sweep the pointer over the buttons
+            pygame.event.post(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1 if (frame // 80) % 2 == 0 else 1))
+
+    app.main(names_filepath, jars_filepath, snapshot_filepath, max_frames=frames, frame_rate=0, on_frame=on_frame)
+
+    # Search latency per keystroke, on the same indexes the app uses
+    snapshot = open_snapshot(names_filepath, jars_filepath, snapshot_filepath)
+    mod_search = ModSearch(snapshot.search_index("names"), snapshot.search_index("jars"), top_k=app.SEARCH_TOP_K)
+    queries = [BENCHMARK_QUERY[:i] for i in range(1, len(BENCHMARK_QUERY) + 1)]
+    queries += queries[-2::-1]  # Backspacing
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        mod_search.search(query)
+        latencies.append(time.perf_counter() - start)
+
+    steady = timer.frames[WARMUP_FRAMES:]
+    stages = ("total", "particles", "buttons", "search_bar", "flip")
+    print(json.dumps({
+        "catalog_size": len(snapshot.catalog),
+        "startup_ms": round(1000 * state["first_frame"], 1),
+        "search_ms": summarize(latencies),
+        "frame_ms": {stage: summarize([frame.get(stage, 0.0) for frame in steady]) for stage in stages},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }))
+
+
+def run_benchmarks(sizes, frames):
+    """
+    Generate a catalog per size and benchmark each in a fresh process.
+
+    Returns:
+        dict: The environment and one result per catalog size.
+    """
+    import pygame  # Only for the version number
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            names_filepath, jars_filepath = generate_catalog(size, directory)
+            snapshot_filepath = os.path.join(directory, f"mod_catalog_{size}.snapshot")
+
+            # Compile the snapshot up front, so startup is measured the way every launch after the first sees it
+            from snapshot import open_snapshot
+            start = time.perf_counter()
+            open_snapshot(names_filepath, jars_filepath, snapshot_filepath)
+            snapshot_ms = round(1000 * (time.perf_counter() - start), 1)
+
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", names_filepath, jars_filepath, snapshot_filepath,
+                 "--frames", str(frames)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result["snapshot_build_ms"] = snapshot_ms
+            results.append(result)
+            print(f"{size:>7} mods: startup {result['startup_ms']:.0f} ms, "
+                  f"frame {result['frame_ms']['total']['mean']:.2f} ms, "
+                  f"search p95 {result['search_ms']['p95']:.2f} ms, "
+                  f"peak RSS {result['peak_rss_mb']:.0f} MB", file=sys.stderr)
+
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "frames": frames,
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare benchmark results against a baseline.
+
+    Args:
+        current (dict): Results from run_benchmarks.
+        baseline (dict): Earlier results from run_benchmarks.
+        tolerance (float): Allowed slowdown, as a fraction of the baseline.
+
+    Returns:
+        list: One (catalog_size, metric, baseline, current) tuple per regression.
+    """
+    def metrics(result):
+        yield "startup_ms", result["startup_ms"]
+        yield "peak_rss_mb", result["peak_rss_mb"]
+        yield "search_ms.p95", result["search_ms"]["p95"]
+        for stage, summary in result["frame_ms"].items():
+            yield f"frame_ms.{stage}.mean", summary["mean"]
+
+    baseline_results = {result["catalog_size"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_results.get(result["catalog_size"])
+        if previous is None:
+            continue
+        previous_metrics = dict(metrics(previous))
+        for name, value in metrics(result):
+            before = previous_metrics.get(name)
+            if before is not None and value > before * (1 + tolerance) and value - before > REGRESSION_FLOOR:
+                regressions.append((result["catalog_size"], name, before, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for startup, search latency and frame time.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES), help="Catalog sizes to benchmark")
+    parser.add_argument("--frames", type=int, default=BENCHMARK_FRAMES, help="Frames rendered per run")
+    parser.add_argument("--output", help="Write the results as JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against results stored in this file")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--child", nargs=3, metavar=("NAMES", "JARS", "SNAPSHOT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Asset paths in main.py are relative to the repository
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if args.child:
+        run_child(*args.child, frames=args.frames)
+        return
+
+    results = run_benchmarks(args.sizes, args.frames)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for size, name, before, after in regressions:
+            print(f"REGRESSION {size} mods {name}: {before} -> {after}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
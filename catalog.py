@@ -0,0 +1,263 @@
+import re
+
+LOADERS = ("neoforge", "fabric", "forge", "quilt")
+
+# Version-like runs ("2.1.3", "1.20.x"), optionally prefixed by "v", "v." or "mc"
+VERSION_PATTERN = re.compile(r"(?i)(?<![0-9.])(mc[\s_-]?|v\.?)?(\d+(?:\.(?:\d+|x))+)")
+MC_VERSION_PATTERN = re.compile(r"(?i)^1\.(?:1[4-9]|2\d)(?:\.(?:\d{1,2}|x))?$")
+LOADER_PATTERN = re.compile(r"(?i)(?<![a-z])(" + "|".join(LOADERS) + r")(?![a-z])")
+NAME_TOKEN_PATTERN = re.compile(r"[\s_+-]+")
+
+
+def normalize_name(name):
+    """
+    Normalize a mod name for lookups ("Sodium Extra", "sodium-extra" -> "sodiumextra").
+    """
+    return "".join(char for char in name.lower() if char.isalnum())
+
+
+def parse_jar_name(jar):
+    """
+    Parse the mod slug, mod version, Minecraft version and loader from a jar filename.
+
+    Handles the common naming schemes, for example:
+        advancednetherite-fabric-2.1.3-1.20.1.jar
+        adorabuild-structures-2.8.0-fabric-1.20.1.jar
+        sodium-fabric-0.5.13+mc1.20.1.jar
+        AdditionalStructures-1.20.x-(v.4.2.2-fabric).jar
+        BarteringStation-v8.0.0-1.20.1-Fabric.jar
+
+    Args:
+        jar (str): The jar filename.
+
+    Returns:
+        tuple: (slug, version, mc_version, loader); parts that can't be found are None.
+    """
+    stem = re.sub(r"(?i)(\.mod)?\.jar$", "", jar.strip())
+    stem = re.sub(r"^\[[^\]]*\]\s*", lambda match: " " * len(match.group()), stem)  # "[1.20.1] Name" prefix
+
+    loader_match = LOADER_PATTERN.search(stem)
+    loader = loader_match.group(1).lower() if loader_match else None
+
+    # Minecraft version: prefer explicit markers ("mc1.20.1", "+1.20.1", "[1.20.1]"), then plain runs
+    versions = list(VERSION_PATTERN.finditer(jar))
+    mc_match = None
+    for marked in (
+        lambda match: match.group(1) and match.group(1)[0] in "mM",
+        lambda match: match.start() > 0 and jar[match.start() - 1] in "+[",
+        lambda match: True,
+    ):
+        for match in versions:
+            if marked(match) and MC_VERSION_PATTERN.match(match.group(2)):
+                mc_match = match
+                break
+        if mc_match:
+            break
+    mc_version = mc_match.group(2).lower() if mc_match else None
+
+    # Mod version: the first version run that isn't the Minecraft version
+    version = None
+    for match in versions:
+        if match is not mc_match and not (match.group(1) or "").lower().startswith("mc"):
+            version = match.group(2)
+            break
+
+    # Slug: the leading words, up to the first version, loader or bracket
+    slug_words = []
+    for word in NAME_TOKEN_PATTERN.split(stem.strip()):
+        if not word or word[0].isdigit() or word[0] in "([":
+            break
+        if word.lower() in LOADERS and slug_words:  # A leading loader is part of the name ("fabric-api")
+            break
+        if re.match(r"(?i)^(v|mc)\.?\d", word):
+            break
+        slug_words.append(word)
+    slug = "-".join(slug_words) or None
+
+    return slug, version, mc_version, loader
+
+
+class ModInfo:
+    """
+    A single catalog entry with the metadata parsed from its jar filename.
+    """
+
+    __slots__ = ("index", "name", "jar", "slug", "version", "mc_version", "loader", "normalized")
+
+    def __init__(self, index, name, jar, slug, version, mc_version, loader, normalized):
+        self.index = index
+        self.name = name
+        self.jar = jar
+        self.slug = slug
+        self.version = version
+        self.mc_version = mc_version
+        self.loader = loader
+        self.normalized = normalized
+
+    @classmethod
+    def parse(cls, index, name, jar):
+        """
+        Create an entry, parsing the metadata from the jar filename.
+
+        Args:
+            index (int): Position in the catalog.
+            name (str): The mod name.
+            jar (str): The jar filename.
+
+        Returns:
+            ModInfo: The new entry.
+        """
+        return cls(index, name, jar, *parse_jar_name(jar), normalize_name(name))
+
+    def __repr__(self):
+        return f"ModInfo({self.name!r}, {self.jar!r})"
+
+
+class ModCatalog:
+    def __init__(self, mods):
+        """
+        Initialize the mod catalog.
+
+        The secondary indexes are built on the first lookup, so a catalog
+        over lazily decoded records (see snapshot.py) opens without touching
+        every entry.
+
+        Args:
+            mods (sequence): The ModInfo entries, in catalog order.
+        """
+        self.mods = mods
+
+        # Secondary indexes: key -> list of ModInfo, in catalog order
+        self.by_loader = None
+        self.by_mc_version = None
+        self.by_name = None
+        self.by_loader_mc_version = None
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Build the catalog from (mod_name, mod_jar) tuples, as returned by load_mod_data.
+        """
+        return cls([ModInfo.parse(i, name, jar) for i, (name, jar) in enumerate(entries)])
+
+    @classmethod
+    def load(cls, names_filepath, jars_filepath):
+        """
+        Load the catalog from the mod names and mod jar files.
+        """
+        return cls.from_entries(load_mod_data(names_filepath, jars_filepath))
+
+    def _build_indexes(self):
+        self.by_loader = {}
+        self.by_mc_version = {}
+        self.by_name = {}
+        self.by_loader_mc_version = {}
+        for mod in self.mods:
+            self.by_loader.setdefault(mod.loader, []).append(mod)
+            self.by_mc_version.setdefault(mod.mc_version, []).append(mod)
+            self.by_name.setdefault(mod.normalized, []).append(mod)
+            self.by_loader_mc_version.setdefault((mod.loader, mod.mc_version), []).append(mod)
+
+    def __len__(self):
+        return len(self.mods)
+
+    def __iter__(self):
+        return iter(self.mods)
+
+    def __getitem__(self, index):
+        return self.mods[index]
+
+    def find(self, name):
+        """
+        Look up a mod by name, ignoring case, spaces and punctuation.
+
+        Args:
+            name (str): The mod name.
+
+        Returns:
+            ModInfo: The first mod with that name, or None.
+        """
+        if self.by_name is None:
+            self._build_indexes()
+        mods = self.by_name.get(normalize_name(name))
+        return mods[0] if mods else None
+
+    def filter(self, loader=None, mc_version=None):
+        """
+        Get the mods for a loader and/or Minecraft version.
+
+        Every combination is a single index lookup, so the cost follows the
+        result size rather than the catalog size.
+
+        Args:
+            loader (str): The loader ("fabric", "forge", ...), or None for any.
+            mc_version (str): The Minecraft version ("1.20.1"), or None for any.
+
+        Returns:
+            list: The matching ModInfo objects, in catalog order.
+        """
+        if loader is None and mc_version is None:
+            return list(self.mods)
+        if self.by_loader is None:
+            self._build_indexes()
+        if loader is None:
+            return list(self.by_mc_version.get(mc_version, ()))
+        if mc_version is None:
+            return list(self.by_loader.get(loader.lower(), ()))
+        return list(self.by_loader_mc_version.get((loader.lower(), mc_version), ()))
+
+
+def diff_catalogs(old, new):
+    """
+    Match the mods of a reloaded catalog to the ones they replace.
+
+    A mod is the same mod if its name and jar are unchanged; repeated
+    entries are matched in catalog order.
+
+    Args:
+        old (ModCatalog): The catalog being replaced.
+        new (ModCatalog): The reloaded catalog.
+
+    Returns:
+        list: For every mod in the new catalog, its index in the old one, or -1 if it was added.
+    """
+    old_indices = {}  # (name, jar) -> old indices, last first
+    for mod in reversed(old):
+        old_indices.setdefault((mod.name, mod.jar), []).append(mod.index)
+
+    previous = []
+    for mod in new:
+        indices = old_indices.get((mod.name, mod.jar))
+        previous.append(indices.pop() if indices else -1)
+    return previous
+
+
+def load_mod_data(names_filepath, jars_filepath):
+    """
+    Load mod names and their corresponding jar file names.
+
+    Args:
+        names_filepath (str): Path to the mod names file.
+        jars_filepath (str): Path to the mod jar file names.
+
+    Returns:
+        list: A list of tuples where each tuple contains (mod_name, mod_jar).
+    """
+    with open(names_filepath, "r", encoding="utf-8") as names_file, open(jars_filepath, "r", encoding="utf-8") as jars_file:
+        mod_names = [line.strip() for line in names_file.readlines()]
+        mod_jars = [line.strip() for line in jars_file.readlines()]
+        return list(zip(mod_names, mod_jars))  # Pair mod names with their corresponding jar files
+
+
+def write_mod_data(mod_data, names_filepath, jars_filepath):
+    """
+    Write mod names and their corresponding jar file names, one per line.
+
+    Args:
+        mod_data (list): (mod_name, mod_jar) tuples, as returned by load_mod_data.
+        names_filepath (str): Path to the mod names file.
+        jars_filepath (str): Path to the mod jar file names.
+    """
+    with open(names_filepath, "w", encoding="utf-8") as names_file, open(jars_filepath, "w", encoding="utf-8") as jars_file:
+        names_file.write("\n".join(name for name, _ in mod_data))
+        jars_file.write("\n".join(jar for _, jar in mod_data))
@@ -0,0 +1,121 @@
+import numpy as np
+import pygame
+
+
+class DirtyRegions:
+    def __init__(self, size, tile_size=32):
+        """
+        Track the damaged parts of the window on a coarse tile grid.
+
+        Damage is recorded by marking tiles, which keeps adding hundreds of
+        small rects (particles) cheap, and is turned into a short list of
+        merged rects when the frame is presented.
+
+        Args:
+            size (tuple): The window size (width, height).
+            tile_size (int): Size of the square tiles damage is tracked in.
+        """
+        self.width, self.height = int(size[0]), int(size[1])
+        self.tile_size = tile_size
+        self.tiles_x = -(-self.width // tile_size)
+        self.tiles_y = -(-self.height // tile_size)
+        self.tiles = np.zeros((self.tiles_y, self.tiles_x), dtype=bool)
+        self.full = False
+
+    def add(self, rect):
+        """
+        Mark a rect as damaged.
+
+        Args:
+            rect (pygame.Rect or tuple): The damaged area in window coordinates.
+        """
+        x, y, w, h = rect
+        if w <= 0 or h <= 0:
+            return
+        t = self.tile_size
+        x0, y0 = max(0, int(x) // t), max(0, int(y) // t)
+        x1, y1 = min(self.tiles_x, int(x + w - 1) // t + 1), min(self.tiles_y, int(y + h - 1) // t + 1)
+        if x0 < x1 and y0 < y1:
+            self.tiles[y0:y1, x0:x1] = True
+
+    def add_many(self, xs, ys, sizes):
+        """
+        Mark many small squares as damaged at once.
+
+        Args:
+            xs (numpy.ndarray): Left edges of the squares.
+            ys (numpy.ndarray): Top edges of the squares.
+            sizes (numpy.ndarray): Edge lengths of the squares (at most one tile).
+        """
+        # Ignore squares that are entirely outside the window
+        inside = (xs + sizes >= 0) & (xs < self.width) & (ys + sizes >= 0) & (ys < self.height)
+        xs, ys, sizes = xs[inside], ys[inside], sizes[inside]
+
+        t = self.tile_size
+        left = np.clip(xs.astype(np.intp) // t, 0, self.tiles_x - 1)
+        top = np.clip(ys.astype(np.intp) // t, 0, self.tiles_y - 1)
+        right = np.clip((xs + sizes).astype(np.intp) // t, 0, self.tiles_x - 1)
+        bottom = np.clip((ys + sizes).astype(np.intp) // t, 0, self.tiles_y - 1)
+        self.tiles[top, left] = True
+        self.tiles[top, right] = True
+        self.tiles[bottom, left] = True
+        self.tiles[bottom, right] = True
+
+    def add_full(self):
+        """
+        Mark the whole window as damaged.
+        """
+        self.full = True
+
+    def coverage(self):
+        """
+        Get the damaged fraction of the window.
+
+        Returns:
+            float: 1.0 if everything is damaged, 0.0 if nothing is.
+        """
+        return 1.0 if self.full else float(self.tiles.mean())
+
+    def rects(self):
+        """
+        Merge the damaged tiles into rects and reset the tracker.
+
+        Runs of dirty tiles in a row become one rect, and identical runs in
+        consecutive rows are merged vertically.
+
+        Returns:
+            list: The damaged areas as pygame.Rect objects.
+        """
+        if self.full:
+            self.clear()
+            return [pygame.Rect(0, 0, self.width, self.height)]
+
+        t = self.tile_size
+        rects = []
+        open_runs = {}  # (start, end) -> rect still growing downwards
+        for row in range(self.tiles_y):
+            line = self.tiles[row]
+            runs = {}
+            if line.any():
+                # Find the starts and ends of the dirty runs in this row
+                edges = np.flatnonzero(np.diff(np.concatenate(([0], line.view(np.int8), [0]))))
+                for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+                    rect = open_runs.get((start, end))
+                    if rect is not None:
+                        rect.height += t
+                    else:
+                        rect = pygame.Rect(start * t, row * t, (end - start) * t, t)
+                        rects.append(rect)
+                    runs[(start, end)] = rect
+            open_runs = runs
+
+        self.clear()
+        window = pygame.Rect(0, 0, self.width, self.height)
+        return [rect.clip(window) for rect in rects]
+
+    def clear(self):
+        """
+        Forget all recorded damage.
+        """
+        self.tiles[:] = False
+        self.full = False
@@ -0,0 +1,101 @@
+import json
+import os
+
+
+class FileCache:
+    def __init__(self, filepath=None, version=1):
+        """
+        A JSON cache of per-file results, keyed by (path, size, mtime).
+
+        An entry is only returned while the file still has the size and
+        modification time it had when the entry was stored.
+
+        Args:
+            filepath (str): Path to the cache file, or None to keep the cache in memory only.
+            version (int): Format version of the cached values; a cache with another version is discarded.
+        """
+        self.filepath = filepath
+        self.version = version
+        self.entries = self._load()  # path -> {"size", "mtime_ns", "value"}
+        self.changed = False
+
+    def _load(self):
+        if not self.filepath:
+            return {}
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        return cache.get("entries", {}) if cache.get("version") == self.version else {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, path, size, mtime_ns):
+        """
+        Get the cached value for a file.
+
+        Args:
+            path (str): Absolute path to the file.
+            size (int): The file's current size.
+            mtime_ns (int): The file's current modification time.
+
+        Returns:
+            The cached value, or None if there is none or the file changed since.
+        """
+        entry = self.entries.get(path)
+        if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+            return None
+        return entry["value"]
+
+    def put(self, path, size, mtime_ns, value):
+        """
+        Store the value for a file.
+        """
+        self.entries[path] = {"size": size, "mtime_ns": mtime_ns, "value": value}
+        self.changed = True
+
+    def prune(self, directory, paths):
+        """
+        Forget the files in a directory that are not in `paths` anymore.
+
+        Args:
+            directory (str): The directory that was scanned.
+            paths (collection): Absolute paths of the files it still holds.
+        """
+        directory = os.path.abspath(directory)
+        for path in [path for path in self.entries if os.path.dirname(path) == directory and path not in paths]:
+            del self.entries[path]
+            self.changed = True
+
+    def save(self):
+        """
+        Write the cache to disk if anything changed.
+        """
+        if not self.filepath or not self.changed:
+            return
+        temporary_filepath = self.filepath + ".tmp"
+        with open(temporary_filepath, "w", encoding="utf-8") as cache_file:
+            json.dump({"version": self.version, "entries": self.entries}, cache_file)
+        os.replace(temporary_filepath, self.filepath)
+        self.changed = False
+
+
+def list_jars(directory):
+    """
+    List the jar files in a folder with their size and modification time.
+
+    Args:
+        directory (str): The folder to list.
+
+    Returns:
+        dict: Absolute path -> (size, mtime_ns).
+    """
+    jars = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(".jar"):
+                stat = entry.stat()
+                jars[os.path.abspath(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+    return jars
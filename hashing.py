@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from file_cache import FileCache, list_jars
+
+CHUNK_SIZE = 1 << 20  # Bytes read per chunk
+CACHE_VERSION = 1
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE):
+    """
+    Hash a file in fixed-size chunks, without ever reading all of it into memory.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int): Bytes read per chunk.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as file:
+        while read := file.readinto(buffer):
+            digest.update(view[:read])  # hashlib releases the GIL here, so threads hash in parallel
+    return digest.hexdigest()
+
+
+class JarHasher:
+    def __init__(self, cache_filepath=None, max_workers=8):
+        """
+        Initialize the jar hasher.
+
+        Digests are cached on disk by (path, size, mtime), so only new or
+        changed jars are read again.
+
+        Args:
+            cache_filepath (str): Path to the JSON digest cache, or None to disable caching.
+            max_workers (int): Number of hashing threads.
+        """
+        self.cache = FileCache(cache_filepath, version=CACHE_VERSION)
+        self.max_workers = max_workers
+        self.hashed = 0  # Jars actually read during the last run
+
+    def hash_folder(self, directory):
+        """
+        Hash every jar in a folder.
+
+        Args:
+            directory (str): The folder holding the mod jars.
+
+        Returns:
+            dict: Jar filename -> hex digest.
+        """
+        jars = list_jars(directory)
+        digests = {path: self.cache.get(path, size, mtime_ns) for path, (size, mtime_ns) in jars.items()}
+
+        changed = [path for path, digest in digests.items() if digest is None]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for path, digest in zip(changed, executor.map(hash_file, changed)):
+                digests[path] = digest
+                self.cache.put(path, *jars[path], digest)
+        self.hashed = len(changed)
+        self.cache.prune(directory, jars)
+        self.cache.save()
+
+        return {os.path.basename(path): digest for path, digest in digests.items()}
+
+
+def find_duplicates(digests):
+    """
+    Find byte-identical jars.
+
+    Args:
+        digests (dict): Jar filename -> digest, as returned by JarHasher.hash_folder.
+
+    Returns:
+        list: Sorted lists of the jar filenames that share a digest.
+    """
+    by_digest = {}
+    for jar, digest in digests.items():
+        by_digest.setdefault(digest, []).append(jar)
+    return sorted(sorted(jars) for jars in by_digest.values() if len(jars) > 1)
+
+
+def find_conflicts(mods):
+    """
+    Find mods that are installed more than once, in different versions.
+
+    Args:
+        mods (iterable): (jar_filename, mod_id, version) tuples; entries without an id are skipped.
+
+    Returns:
+        dict: Mod id -> sorted jar filenames, for every id found with more than one version.
+    """
+    by_id = {}
+    for jar, mod_id, version in mods:
+        if mod_id:
+            by_id.setdefault(mod_id, []).append((jar, version))
+    return {
+        mod_id: sorted(jar for jar, _ in entries)
+        for mod_id, entries in sorted(by_id.items())
+        if len({version for _, version in entries}) > 1
+    }
+
+
+def write_report(report_filepath, duplicates, conflicts):
+    """
+    Write the duplicate and conflict report.
+
+    Args:
+        report_filepath (str): Path to the JSON report.
+        duplicates (list): As returned by find_duplicates.
+        conflicts (dict): As returned by find_conflicts.
+    """
+    with open(report_filepath, "w", encoding="utf-8") as report_file:
+        json.dump({"duplicates": duplicates, "conflicts": conflicts}, report_file, indent=2)
+
+
+def load_flagged_jars(report_filepath):
+    """
+    Get the jars that should be flagged in the mod list.
+
+    Args:
+        report_filepath (str): Path to the JSON report.
+
+    Returns:
+        set: Filenames of every duplicate or conflicting jar; empty if there is no report.
+    """
+    try:
+        with open(report_filepath, "r", encoding="utf-8") as report_file:
+            report = json.load(report_file)
+    except (OSError, ValueError):
+        return set()
+    flagged = {jar for jars in report.get("duplicates", []) for jar in jars}
+    flagged.update(jar for jars in report.get("conflicts", {}).values() for jar in jars)
+    return flagged
@@ -1,236 +1,60 @@
+import math
 import pygame
 import random
+import subprocess
+import sys
 import time
 import webbrowser
-from ui_elements import Button, SearchBar, Scrollbar
+from ui_elements import Button, SearchBar, Scrollbar, SpriteCache
 from state_manager import ButtonStateManager
-import ctypes
-import win32con
-import math
+from snapshot import SourceWatcher, open_snapshot
+from catalog import ModCatalog, diff_catalogs
+from mod_list import LazyRecords, ModRecord, VirtualModList
+from textures import BlockTexturePool
+from particles import ParticleSystem
+from dirty_rects import DirtyRegions
+from search import ModSearch, SearchWorker
+from hashing import load_flagged_jars
+from profiler import FrameProfiler
+from replay import InputRecorder
+from assets import AssetLoader
 import threading
 
 # === Constants ===
 
 DEBUG = False  # Set to False to disable debugging output
-
-# === Initialization ===
-pygame.init()
-pygame.key.set_repeat(300, 50)  # Enable key repeat for the search bar
-
-# Initialize the Pygame mixer
-pygame.mixer.init()
-
-# Load the background music
-pygame.mixer.music.load("data/sounds/minecraft.mp3")
-pygame.mixer.music.set_volume(0.5) # Set the volume (optional, range: 0.0 to 1.0)
-
-# Play the music (loop indefinitely)
-pygame.mixer.music.play(-1)
-
-# Load the hover sound effect
-hover_sound = pygame.mixer.Sound("data/sounds/select.wav")
-hover_sound.set_volume(0.03)  # Set volume (optional)
-
-# Load the search bar extend sound effect
-search_extend_sound = pygame.mixer.Sound("data/sounds/searchextend.wav")
-search_extend_sound.set_volume(0.5)  # Set volume (optional)
-
-press_btn_sound = pygame.mixer.Sound("data/sounds/press.mp3")
-press_btn_sound.set_volume(0.5)  # Set volume (optional)
-
-# Set the window title
-pygame.display.set_caption("Fable Mod List")
-
-# Set the window icon
-icon = pygame.image.load("data/images/icon.png")
-pygame.display.set_icon(icon)
-
-# Initialize the clock for controlling the frame rate
-clock = pygame.time.Clock()
-
-# Center of the window
-window_width = 578.08
-window_height = 867.12
-center_x = window_width / 2
-WINDOW = pygame.display.set_mode((window_width, window_height), pygame.HWSURFACE | pygame.DOUBLEBUF)
-FONT = pygame.font.Font("data/font/minecraft_font.ttf", 24)
-BG_COLOR = (30, 30, 30)
-SCROLLBAR_BG_COLOR = (50, 50, 50)
-scroll_offset = 0
-scroll_velocity = 0
-scroll_speed = 15
-drag_sensitivity = 14
-dt = clock.get_time() / 1000.0  # Delta time in seconds
-
-# Load the background image
-background_image = pygame.image.load("data/images/background.png").convert()
-background_image = pygame.transform.scale(background_image, (WINDOW.get_width(), WINDOW.get_height()))
-
-# Load mod names and mod jar names
-def load_mod_data(names_filepath, jars_filepath):
-    """
-    Load mod names and their corresponding jar file names.
-
-    Args:
-        names_filepath (str): Path to the mod names file.
-        jars_filepath (str): Path to the mod jar file names.
-
-    Returns:
-        list: A list of tuples where each tuple contains (mod_name, mod_jar).
-    """
-    with open(names_filepath, "r") as names_file, open(jars_filepath, "r") as jars_file:
-        mod_names = [line.strip() for line in names_file.readlines()]
-        mod_jars = [line.strip() for line in jars_file.readlines()]
-        return list(zip(mod_names, mod_jars))  # Pair mod names with their corresponding jar files
-
-# Load mod data
-mod_data = load_mod_data("data/mod_names.txt", "data/mod_jar.txt")
-
-# ==FADE CONFIGURATION==
-onscreen_top = 196
-onscreen_bottom = 867
-fade_margin = 90
-fade_range = 30
-
-# ==BUTTON CONFIGURATION==
-button_width = 350
-button_height = 40
-button_spacing = 20  # Spacing between buttons
-start_y = 166  # Padding from the top of the window
-
-# ==BUTTON CONFIGURATION==
-buttons = []
-for i, (mod_name, mod_jar) in enumerate(mod_data):
-    # Calculate button position
-    button_x = center_x - (button_width / 2)  # Center horizontally
-    button_y = start_y + i * (button_height + button_spacing)  # Stack vertically
-
-    # Create the button
-    button = Button(
-        mod_name,
-        (button_x, button_y, button_width, button_height),  # Button position and size
-        (70, 70, 70),  # Default color
-        FONT,  # Font object
-        (255, 255, 255),  # Text color
-        "data/font/minecraft_font.ttf",  # Font path
-        block_type=random.choice(["dirt", "grass", "cobblestone"]),  # Random block type
-        hover_sound=hover_sound,  # Sound effect for hover
-    )
-    button.render_text_to_fit()
-    buttons.append(button)
-
-
-#==SEARCH BAR CONFIGURATION==
-search_bar_width = 50  # Desired width of the search bar
-search_bar_height = 40  # Desired height of the search bar
-search_bar_y = 35       # Y position of the search bar (padding from the top)
-
-# Calculate the X position to center the search bar
-search_bar_x = 70
-
-# Initialize the search bar
-search_bar = SearchBar(
-    (search_bar_x, search_bar_y, search_bar_width, search_bar_height),  # Position and size
-    FONT,  # Font object
-    "data/images/magnifyicon.png",  # Path to the magnifying glass icon
-    extend_sound=search_extend_sound,  # Sound effect for search bar extension
-)
-
-#== SCROLLBAR CONFIGURATION ==
-scrollbar = Scrollbar(
-    (880, 70, 20, 630),
-    total_content_height=len(buttons) * 60,  # 40px button height + 20px spacing
-    visible_height=630
-)
-
-state_manager = ButtonStateManager(buttons)
-
-
-
-# Initialize search bar state
-search_query = ""
-cursor_position = 0
-selection_start = 0
-selection_end = 0
-undo_stack = []
-search_active = False  # Search bar is not active by default
-cursor_visible = False  # Cursor is hidden until search bar is focused
-is_dragging = False  # Flag to check if the scrollbar is being dragged
-search_active = False  # Search bar is expanded or not
-search_animating = False  # Is animation running
-search_width = 50  # Start small
-search_target_width = 800  # Full expanded width
-search_expand_speed = 10  # Base speed of expansion
-
-# Load and resize the custom cursor image
-cursor_image = pygame.image.load("data/images/custom_cursor.png").convert_alpha()
-cursor_image = pygame.transform.scale(cursor_image, (24, 24))  # Resize to 24x24 pixels
-
-# Hide the default cursor
-pygame.mouse.set_visible(False)
-
-# Generate particles for the twinkling effect
-def generate_particles(num_particles, width, height):
-    particles = []
-    for _ in range(num_particles):
-        direction = random.choice([-1, 1])  # -1 for right-to-left, 1 for left-to-right
-        speed = random.uniform(0.1, 0.5) * direction  # Slow horizontal speed
-        size = random.uniform(1, 3)  # Size variation for depth illusion
-        particles.append({
-            "x": random.uniform(0, width) if direction == 1 else random.uniform(-50, 0),  # Start slightly off-screen
-            "y": random.uniform(0, height),  # Random vertical position
-            "vx": speed,  # Horizontal speed
-            "vy": 0,  # No vertical drift
-            "size": size,
-            "brightness": random.randint(150, 255),
-            "direction": direction,
-            "lifetime": random.uniform(5.0, 10.0),  # Lifetime in seconds
-            "age": 0.0,
-            "alpha": 255,
-            "float_phase": random.uniform(0, math.pi * 2)  # For smoother up/down sinusoidal bobbing
-        })
-    return particles
-
-
-def update_and_draw_particles(particles, surface, width, height, dt):
-    for particle in particles:
-        # Update age
-        particle["age"] += dt
-
-        # Respawn particle if its lifetime ends or it moves off-screen
-        if particle["age"] >= particle["lifetime"] or particle["x"] < -50 or particle["x"] > width + 50:
-            particle["x"] = random.uniform(-50, 0) if particle["direction"] == 1 else random.uniform(width, width + 50)
-            particle["y"] = random.uniform(0, height)
-            particle["vx"] = random.uniform(0.1, 0.5) * particle["direction"]  # Slow horizontal speed
-            particle["size"] = random.uniform(1, 3)
-            particle["brightness"] = random.randint(150, 255)
-            particle["lifetime"] = random.uniform(5.0, 10.0)
-            particle["age"] = 0.0
-            particle["float_phase"] = random.uniform(0, math.pi * 2)
-
-        # Bobbing up and down using a sine wave
-        bobbing = math.sin(particle["float_phase"] + particle["age"] * 2.0) * 0.5
-        particle["y"] += bobbing
-
-        # Move particle horizontally
-        particle["x"] += particle["vx"]
-
-        # Calculate alpha based on lifetime
-        life_ratio = 1.0 - (particle["age"] / particle["lifetime"])
-        particle["alpha"] = int(255 * life_ratio)
-
-        # Clamp alpha
-        particle["alpha"] = max(0, min(255, particle["alpha"]))
-
-        # Draw particle
-        color = (particle["brightness"], particle["brightness"], particle["brightness"], particle["alpha"])
-        particle_surface = pygame.Surface((particle["size"] * 2, particle["size"] * 2), pygame.SRCALPHA)
-        pygame.draw.circle(particle_surface, color, (int(particle["size"]), int(particle["size"])), int(particle["size"]))
-        surface.blit(particle_surface, (particle["x"], particle["y"]))
-
-particles = generate_particles(100, 900, 700)
+TEXTURE_VARIANTS = 8  # Pre-generated textures per block type
+TEXTURE_SEED = None  # Set to an int for reproducible button textures
+SPRITE_CACHE_SIZE = 256  # Composited button sprites kept in memory
+PARTICLE_COUNT = 100  # Number of twinkling background particles
+PARTICLE_SEED = None  # Set to an int for reproducible particles
+DIRTY_RENDERING = True  # Push only damaged regions and sleep while idle (False: flip every frame)
+IDLE_FRAME_MS = 50  # Frame interval while idle (particles keep drifting at this rate)
+SEARCH_TOP_K = 200  # Search results ordered by score; the rest follow in list order
+SEARCH_DEBOUNCE = 0.03  # Seconds the query must be unchanged before it is searched
+MOD_NAMES_FILE = "data/mod_names.txt"  # One mod name per line
+MOD_JARS_FILE = "data/mod_jar.txt"  # The matching jar file names, one per line
+CATALOG_SNAPSHOT = "data/mod_catalog.snapshot"  # Compiled catalog, rebuilt when the mod text files change
+CATALOG_POLL_INTERVAL = 0.5  # Seconds between checks of the mod text files for changes (reloaded in place), or None
+MODS_DIRECTORY = None  # Mods folder to generate the mod text files from at startup, or None to use them as they are
+MOD_REPORT = "data/mod_report.json"  # Duplicate and conflict report written by scanner.py
+ASSET_WORKERS = 4  # Threads decoding images and sounds in the background
+ASSET_CACHE = "data/asset_cache"  # Decoded, scaled images kept on disk (rebuilt when an image or the window size changes), or None
+FRAME_RATE = 230  # Frame rate cap (motion is the same at any rate, e.g. 60 to save power)
+SIMULATION_RATE = 120  # Fixed animation steps per second; frames in between are interpolated
+MAX_FRAME_TIME = 0.25  # Most time simulated in one frame, so a stall doesn't fast-forward everything
+PROFILE = False  # Start with the frame profiler on (F3 toggles it and its overlay, F4 saves a trace)
+PROFILE_HISTORY = 600  # Frames kept for the profiler percentiles and trace
+PROFILE_TRACE_FILE = "frame_trace.json"  # Chrome trace written by F4 (open in chrome://tracing or Perfetto)
+
+# === Helpers ===
 
 def bring_window_to_foreground():
+    if sys.platform != "win32":
+        return  # Uses the Win32 API
+    import ctypes
+    import win32con
+
     hwnd = pygame.display.get_wm_info()['window']
 
     # Get the thread ID of the current foreground window
@@ -252,295 +76,654 @@ def bring_window_to_foreground():
     # Restore the window if it is minimized
     ctypes.windll.user32.ShowWindow(hwnd, win32con.SW_RESTORE)
 
-# Update button positions and fade them in/out
-def update_button_positions_and_fade(buttons, scroll_offset):
-    for button in buttons:
-        # Always calculate based on true position
-        button_top = button.target_y - scroll_offset
-        button_bottom = button_top + button.rect.height
-
-        # --- Calculate onscreen alpha (fade at edges) ---
-        if button_bottom < onscreen_top - fade_margin or button_top > onscreen_bottom + fade_margin:
-            button.onscreen_alpha = 0
-        elif button_bottom < onscreen_top:
-            distance = onscreen_top - button_bottom
-            button.onscreen_alpha = max(0, 255 - int(255 * (distance / fade_range)))
-        elif button_top > onscreen_bottom:
-            distance = button_top - onscreen_bottom
-            button.onscreen_alpha = max(0, 255 - int(255 * (distance / fade_range)))
-        else:
-            button.onscreen_alpha = 255
-
-        # --- Smoothly update search_alpha based on match ---
-        if button.is_match:
-            if button.search_alpha < 255:
-                button.search_alpha += 15
-                button.search_alpha = min(255, button.search_alpha)
-        else:
-            if button.search_alpha > 0:
-                button.search_alpha -= 15
-                button.search_alpha = max(0, button.search_alpha)
-
-
-        # --- Calculate final alpha ---
-        button.alpha = min(button.search_alpha, button.onscreen_alpha)
-
-        # --- Move smoothly toward target_y ---
-        dy = button.target_y - button.rect.y
-        if abs(dy) > 1:
-            button.rect.y += dy * 0.2
-        else:
-            button.rect.y = button.target_y
-
-        # --- Set visibility based on final alpha ---
-        button.visible = button.alpha > 0
-   
-def update_target_positions(buttons, search_query, button_spacing):
-    y_position = start_y  # Starting y-position for buttons
-    for button in buttons:
-        previous_visible = button.visible  # Track the previous visibility state
-        button.is_match = matches_query(button.text, search_query)
-        if button.is_match:
-            button.target_y = y_position
-            y_position += button.rect.height + button_spacing
-
-
-        # Print only if the visibility state changes
-        if DEBUG and button.visible != previous_visible:
-            print(f"Button '{button.text}': visible={button.visible}, target_y={button.target_y}, rect.y={button.rect.y}")
-
-def matches_query(button_text, search_query):
-    if not search_query.strip():
-        return True  # Show all buttons if the query is empty
-
-    button_text = button_text.lower()
-    search_query = search_query.lower()
-    i = 0
-    for char in button_text:
-        if i < len(search_query) and char == search_query[i]:
-            i += 1
-
-    # Debugging output
-    if DEBUG: print(f"Matching '{search_query}' with '{button_text}': {'Matched' if i == len(search_query) else 'Not Matched'}")
-    return i == len(search_query)
+def read_clipboard():
+    """
+    Get the text on the clipboard, or an empty string if there is none.
+    """
+    try:
+        if not pygame.scrap.get_init():
+            pygame.scrap.init()
+        data = pygame.scrap.get(pygame.SCRAP_TEXT)
+    except pygame.error:
+        return ""
+    return data.decode("utf-8", errors="ignore").replace("\0", "") if data else ""
 
 def open_url(url):
     webbrowser.open(url)
     time.sleep(0.3)  # Delay to ensure the thread is ready
     bring_window_to_foreground()
 
-# === Main Game Loop ===
-running = True
-search_query = ""
-previous_search_query = ""
-cursor_position = 0
-while running:
-    # Draw the background image
-    WINDOW.blit(background_image, (0, 0))
-    mouse_pos = pygame.mouse.get_pos()
-
-    # Update hover state
-    state_manager.update_hover_state(mouse_pos, scroll_offset)
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
 
-        elif event.type == pygame.WINDOWFOCUSLOST:
-            # print("Window lost focus")
-            bring_window_to_foreground()
-
-        # Handle mouse button down events
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1:  # Left mouse button
-                state_manager.handle_mouse_down()
-                if search_bar.icon_rect.collidepoint(event.pos):  # Check if clicked on magnifying glass
-                    search_bar.toggle()  # Toggle the search bar state
-
-                if scrollbar.thumb_rect.collidepoint(mouse_pos):
-                    is_dragging = True
-                    drag_offset = mouse_pos[1] - scrollbar.thumb_rect.y
-                elif search_bar.rect.collidepoint(mouse_pos):
-                    search_active = True
-                    cursor_visible = True
-                    pygame.mouse.set_visible(False)  # Ensure system cursor is hidden
-                else:
-                    search_active = False
-                    cursor_visible = False
-                    pygame.mouse.set_visible(False)  # Ensure system cursor is hidden elsewhere
-
-                # Check if a button is clicked
-                for button in buttons:
-                    if not button.visible:
-                        continue  # Ignore non-matching buttons
-
-                    adjusted_rect = button.rect.move(0, -scroll_offset)
-                    if adjusted_rect.collidepoint(mouse_pos):
-                        # Find correct mod_jar based on button.text
-                        for mod_name, mod_jar in mod_data:
-                            if mod_name == button.text:
-                                press_btn_sound.play()
-                                google_search_url = f"https://www.google.com/search?q={mod_jar.replace(' ', '+')}"
-                                threading.Thread(target=open_url, args=(google_search_url,), daemon=True).start()
-                                # time.sleep(0.5)
-                                break
-                        break
-
-        # Handle mouse button up events
-        elif event.type == pygame.MOUSEBUTTONUP:
-            is_dragging = False
-            if event.button == 1:
-                state_manager.handle_mouse_up()
-
-        # Handle mouse wheel scrolling
-        elif event.type == pygame.MOUSEWHEEL:
-            if event.y > 0:  # Scroll up
-                scroll_velocity -= scroll_speed
-            elif event.y < 0:  # Scroll down
-                scroll_velocity += scroll_speed
-        
-            # Clamp scroll offset
-            max_scroll = scrollbar.total_content_height - scrollbar.visible_height
-            scroll_offset = max(0, min(scroll_offset, max_scroll))
+# === Main ===
+
+def main(names_filepath=MOD_NAMES_FILE, jars_filepath=MOD_JARS_FILE, snapshot_filepath=CATALOG_SNAPSHOT,
+         max_frames=None, frame_rate=FRAME_RATE, on_frame=None, seed=None, frame_time=None, record_filepath=None):
+    """
+    Open the mod list window and run it until it is closed.
+
+    Args:
+        names_filepath (str): Path to the mod names file.
+        jars_filepath (str): Path to the mod jar file names.
+        snapshot_filepath (str): Path to the compiled catalog snapshot.
+        max_frames (int): Stop after this many frames, or None to run until the window is closed.
+        frame_rate (int): Frame rate cap, or 0 for none.
+        on_frame (callable): Called after every frame with the frame number, e.g. to post scripted input.
+        seed (int): Seed for the button block types, textures and particles, or None for TEXTURE_SEED/PARTICLE_SEED.
+        frame_time (float): Simulate exactly this many seconds per frame and never wait for input or searches,
+            so scripted runs are deterministic; None to follow the real clock.
+        record_filepath (str): Record the input events to this trace file (see replay.py), or None.
+    """
+    # === Initialization ===
+    # One seed for everything random, so a recorded session replays the same
+    if record_filepath and seed is None:
+        seed = random.randrange(2 ** 31)
+    if seed is not None:
+        random.seed(seed)
+    texture_seed = TEXTURE_SEED if seed is None else seed
+    particle_seed = PARTICLE_SEED if seed is None else seed
+    recorder = InputRecorder(seed) if record_filepath else None
+
+    pygame.init()
+    pygame.key.set_repeat(300, 50)  # Enable key repeat for the search bar
+
+    # Center of the window
+    window_width = 578.08
+    window_height = 867.12
+    center_x = window_width / 2
+
+    # Decode images and sounds in the background while the catalog and textures are
+    # prepared; the first frames are drawn without any image that is still loading,
+    # and each one (like sounds and music) simply starts being used once it has loaded
+    assets = AssetLoader(max_workers=ASSET_WORKERS, cache_directory=ASSET_CACHE)
+    background_asset = assets.image("data/images/background.png", size=(int(window_width), int(window_height)))
+    cursor_asset = assets.image("data/images/custom_cursor.png", size=(24, 24), alpha=True)  # Resize to 24x24 pixels
+    search_icon_asset = assets.image("data/images/magnifyicon.png", size=(30, 30), alpha=True)
+    window_icon_asset = assets.image("data/images/icon.png")
+
+    # Background music (optional, it isn't part of the repository), looped indefinitely
+    assets.music("data/sounds/minecraft.mp3", volume=0.5)
+
+    # Sound effects
+    hover_sound = assets.sound("data/sounds/select.wav", volume=0.03)
+    search_extend_sound = assets.sound("data/sounds/searchextend.wav", volume=0.5)
+    press_btn_sound = assets.sound("data/sounds/press.mp3", volume=0.5)
+
+    # Set the window title
+    pygame.display.set_caption("Fable Mod List")
+
+    # Initialize the clock for controlling the frame rate
+    clock = pygame.time.Clock()
+    WINDOW = pygame.display.set_mode((window_width, window_height), pygame.HWSURFACE | pygame.DOUBLEBUF)
+    FONT = pygame.font.Font("data/font/minecraft_font.ttf", 24)
+    BG_COLOR = (30, 30, 30)
+    scroll_offset = 0
+    scroll_velocity = 0  # Pixels per second
+    scroll_speed = 3450  # Velocity added per wheel notch, in pixels per second
+    scroll_friction = 24.2  # Scroll velocity decays by a factor of e every 1/scroll_friction seconds
+    scroll_stop_speed = 23  # Scrolling stops below this velocity, in pixels per second
+    step = 1 / SIMULATION_RATE  # Length of a simulation step, in seconds
+
+    # Regenerate the mod text files from the jars in the mods folder. The scanner runs as
+    # its own process, since its worker processes would re-run this script on Windows.
+    if MODS_DIRECTORY:
+        subprocess.run([sys.executable, "scanner.py", MODS_DIRECTORY], check=True)
+
+    # Load the mod catalog (names, jar files and the metadata parsed from them) from its
+    # memory-mapped snapshot, which is rebuilt whenever the text files change
+    catalog_snapshot = open_snapshot(names_filepath, jars_filepath, snapshot_filepath)
+    catalog = catalog_snapshot.catalog
+    catalog_watcher = SourceWatcher((names_filepath, jars_filepath), CATALOG_POLL_INTERVAL) if CATALOG_POLL_INTERVAL else None
+
+    # Jars the last scan found to be duplicates or conflicting versions of the same mod
+    flagged_jars = load_flagged_jars(MOD_REPORT)
+
+    # ==FADE CONFIGURATION==
+    onscreen_top = 196
+    onscreen_bottom = 867
+    fade_margin = 90
+    fade_range = 30
+
+    # ==BUTTON CONFIGURATION==
+    button_width = 350
+    button_height = 40
+    button_spacing = 20  # Spacing between buttons
+    start_y = 166  # Padding from the top of the window
+
+    # Shared block textures, referenced by every button
+    texture_pool = BlockTexturePool((button_width, button_height), variants=TEXTURE_VARIANTS, seed=texture_seed)
+    if DEBUG: print(f"Texture pool: seed={texture_pool.seed}, {texture_pool.memory_footprint() / 1024:.0f} KB")
+
+    # Pre-composited button sprites, shared by every button
+    sprite_cache = SpriteCache(max_entries=SPRITE_CACHE_SIZE)
+
+    # ==MOD LIST CONFIGURATION==
+    # One lightweight record per mod, created the first time the mod is needed;
+    # Buttons only exist for rows near the viewport
+    def create_record(index):
+        """
+        Create the list record for a mod.
+
+        Args:
+            index (int): The mod's position in the catalog.
+
+        Returns:
+            ModRecord: The record.
+        """
+        return ModRecord(
+            index, catalog[index],
+            block_type=random.choice(["dirt", "grass", "cobblestone"]),  # Random block type
+        )
+
+    mod_records = LazyRecords(len(catalog), create_record)
+
+    def create_button(record):
+        """
+        Materialize a Button for a mod record entering the viewport.
+
+        Args:
+            record (ModRecord): The record to create the button for.
+
+        Returns:
+            Button: The button; its y and alpha are animated by the mod list.
+        """
+        button_x = center_x - (button_width / 2)  # Center horizontally
+        button = Button(
+            record.name,
+            (button_x, 0, button_width, button_height),  # Button position and size
+            (70, 70, 70),  # Default color
+            FONT,  # Font object
+            (255, 255, 255),  # Text color
+            "data/font/minecraft_font.ttf",  # Font path
+            block_type=record.block_type,
+            hover_sound=hover_sound,  # Sound effect for hover
+            texture=texture_pool.get(record.block_type, record.index),  # Shared texture variant
+            sprite_cache=sprite_cache,  # Shared composited sprites
+            flagged=record.jar in flagged_jars,  # Warn about duplicates and conflicts
+        )
+        button.render_text_to_fit()
+        return button
+
+    mod_list = VirtualModList(
+        mod_records,
+        create_button,
+        start_y=start_y,
+        row_height=button_height + button_spacing,
+        button_height=button_height,
+        onscreen_top=onscreen_top,
+        onscreen_bottom=onscreen_bottom,
+        fade_margin=fade_margin,
+        fade_range=fade_range,
+    )
+    buttons = mod_list.buttons  # Only the materialized buttons, kept up to date in place
 
-        # Handle mouse motion (dragging the scrollbar)
-        elif event.type == pygame.MOUSEMOTION and is_dragging:
-            # Move the thumb based on mouse movement
-            new_thumb_y = mouse_pos[1] - drag_offset
+    # Ranked search over the mod names and jar filenames, mapped from the snapshot
+    mod_search = ModSearch(catalog_snapshot.search_index("names"), catalog_snapshot.search_index("jars"), top_k=SEARCH_TOP_K)
 
-            # Clamp thumb inside scrollbar area
-            thumb_height = scrollbar.thumb_rect.height
-            new_thumb_y = max(scrollbar.rect.y, min(scrollbar.rect.y + scrollbar.rect.height - thumb_height, new_thumb_y))
+    # Matching runs on a worker thread; results are applied at the start of a frame
+    search_worker = SearchWorker(mod_search.search, debounce=SEARCH_DEBOUNCE)
 
-            # Calculate the scroll offset based on thumb position
-            scroll_percentage = (new_thumb_y - scrollbar.rect.y) / (scrollbar.rect.height - thumb_height)
-            max_scroll = scrollbar.total_content_height - scrollbar.visible_height
-            scroll_offset = scroll_percentage * max_scroll
-            
-        # Handle key presses for the search bar
-        elif event.type == pygame.KEYDOWN and search_active:
-            ctrl = pygame.key.get_mods() & pygame.KMOD_CTRL
-            shift = pygame.key.get_mods() & pygame.KMOD_SHIFT
-
-            if ctrl and event.key == pygame.K_a:
-                # Ctrl+A select all
-                selection_start = 0
-                selection_end = len(search_query)
-                cursor_position = len(search_query)
-            elif ctrl and event.key == pygame.K_z:
-                # Ctrl+Z undo
-                if undo_stack:
-                    search_query, cursor_position = undo_stack.pop()
-                    selection_start = selection_end = cursor_position
-            elif shift and event.key == pygame.K_LEFT:
-                # Shift + Left Arrow: Extend selection to the left
-                if cursor_position > 0:
-                    cursor_position -= 1
-                    selection_end = cursor_position
-            elif shift and event.key == pygame.K_RIGHT:
-                # Shift + Right Arrow: Extend selection to the right
-                if cursor_position < len(search_query):
-                    cursor_position += 1
-                    selection_end = cursor_position
-            else:
-                if event.key == pygame.K_BACKSPACE:
-                    if selection_start != selection_end:
-                        # Delete selection
-                        start, end = sorted([selection_start, selection_end])
-                        undo_stack.append((search_query, cursor_position))
-                        search_query = search_query[:start] + search_query[end:]
-                        cursor_position = start
-                        selection_start = selection_end = cursor_position
-                    elif cursor_position > 0:
-                        # Delete character before cursor
-                        undo_stack.append((search_query, cursor_position))
-                        search_query = search_query[:cursor_position - 1] + search_query[cursor_position:]
-                        cursor_position -= 1
-                        selection_start = selection_end = cursor_position
+
+    #==SEARCH BAR CONFIGURATION==
+    search_bar_width = 50  # Desired width of the search bar
+    search_bar_height = 40  # Desired height of the search bar
+    search_bar_y = 35       # Y position of the search bar (padding from the top)
+
+    # Calculate the X position to center the search bar
+    search_bar_x = 70
+
+    # Initialize the search bar
+    search_bar = SearchBar(
+        (search_bar_x, search_bar_y, search_bar_width, search_bar_height),  # Position and size
+        FONT,  # Font object
+        None,  # The magnifying glass icon is set once it has loaded in the background
+        icon=search_icon_asset.peek(),
+        extend_sound=search_extend_sound,  # Sound effect for search bar extension
+    )
+
+    #== SCROLLBAR CONFIGURATION ==
+    scrollbar = Scrollbar(
+        (880, 70, 20, 630),
+        total_content_height=len(mod_records) * 60,  # 40px button height + 20px spacing
+        visible_height=630
+    )
+
+    state_manager = ButtonStateManager(buttons, hit_test=mod_list.hit_test)
+
+
+
+    # Initialize search bar state
+    search_field = search_bar.field  # Query text, cursor, selection and undo history
+    search_query = ""
+    search_active = False  # Search bar is not active by default
+    is_dragging = False  # Flag to check if the scrollbar is being dragged
+    search_active = False  # Search bar is expanded or not
+    search_animating = False  # Is animation running
+
+    # The background and custom cursor, decoded in the background. Until they have loaded
+    # the background is filled with BG_COLOR and the system cursor is shown
+    background_image = background_asset.peek()
+    cursor_image = cursor_asset.peek()
+
+    # Hide the default cursor once the custom one can be drawn
+    pygame.mouse.set_visible(cursor_image is None)
+
+    # Particles for the twinkling effect
+    particles = ParticleSystem(PARTICLE_COUNT, 900, 700, seed=particle_seed)
+
+    def update_target_positions(search_query, matched, scroll_offset):
+        mod_list.set_layout(matched, scroll_offset)  # Best matches first
+        if DEBUG: print(f"Search '{search_query}' matched {len(matched)} of {len(mod_records)} mods")
+
+    def draw_in(dirty, bounds, draw, *args, **kwargs):
+        """
+        Call a draw function once for every dirty rect it overlaps, clipped to that rect.
+
+        Args:
+            dirty (list): The damaged areas, as pygame.Rect objects.
+            bounds (pygame.Rect): The area the draw function covers.
+            draw (callable): Draws onto WINDOW; called with the remaining arguments.
+        """
+        for rect in dirty:
+            if rect.colliderect(bounds):
+                WINDOW.set_clip(rect)
+                draw(*args, **kwargs)
+
+    # === Main Game Loop ===
+    running = True
+    frame = 0
+    search_query = ""
+    previous_search_query = ""
+    idle = False
+    previous_scroll_offset = None
+    previous_list_animating = True
+    step_scroll_offset = scroll_offset  # Scroll offset before the last simulation step
+    view_offset = scroll_offset  # Interpolated scroll offset the frame is drawn at
+    scroll_px = int(view_offset)  # The same in whole pixels, as the list is drawn and hit-tested
+    accumulator = 0.0  # Time not simulated yet, in seconds
+    step_time = time.perf_counter()
+    previous_cursor_rect = None
+    previous_search_rect = None
+    previous_particle_bounds = None
+    previous_hovered_rect = None
+    damage = DirtyRegions(WINDOW.get_size())
+    damage.add_full()  # The first frame is drawn in full
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    cpu_time = {True: 0.0, False: 0.0}  # idle -> CPU seconds spent in those frames
+    wall_time = {True: 0.0, False: 0.0}  # idle -> wall seconds spent in those frames
+    report_time = wall_start
+    caption_time = wall_start
+    profiler_rect = pygame.Rect(10, 10, 300, 200)  # Where the profiler overlay is drawn
+    profiler = FrameProfiler(history=PROFILE_HISTORY, enabled=PROFILE)
+    while running:
+        profiling = profiler.enabled  # Every profiler call below is behind this one flag
+
+        # The window icon is set once it has loaded
+        if window_icon_asset is not None and window_icon_asset.ready():
+            try:
+                pygame.display.set_icon(window_icon_asset.get())
+            except (pygame.error, FileNotFoundError):
+                if DEBUG: print("Window icon could not be loaded")
+            window_icon_asset = None
+
+        # Images still loading are swapped in, and everything redrawn, as they arrive
+        if background_asset is not None and background_asset.ready():
+            background_image = background_asset.peek()  # Stays filled with BG_COLOR if it failed to load
+            background_asset = None
+            damage.add_full()
+        if cursor_asset is not None and cursor_asset.ready():
+            cursor_image = cursor_asset.peek()  # The system cursor stays if it failed to load
+            cursor_asset = None
+            pygame.mouse.set_visible(cursor_image is None)
+        if search_icon_asset is not None and search_icon_asset.ready():
+            search_bar.icon = search_icon_asset.peek()
+            search_icon_asset = None
+            damage.add(search_bar.rect)
+
+        # Block until input arrives (or the idle frame is due) when nothing is moving
+        if DIRTY_RENDERING and idle and frame_time is None:
+            first_event = pygame.event.wait(IDLE_FRAME_MS if PARTICLE_COUNT else 500)
+            events = [first_event] if first_event.type != pygame.NOEVENT else []
+            events += pygame.event.get()
+        else:
+            events = pygame.event.get()
+        if recorder: recorder.capture(events)
+        if profiling: profiler.mark("wait")
+
+        mouse_pos = pygame.mouse.get_pos()
+
+        # Reload the mod text files when they change, keeping the buttons of the mods still in them
+        if catalog_watcher and catalog_watcher.poll():
+            try:
+                reloaded_snapshot = open_snapshot(names_filepath, jars_filepath, snapshot_filepath)
+                reloaded_catalog = reloaded_snapshot.catalog
+                names, jars = reloaded_snapshot.search_index("names"), reloaded_snapshot.search_index("jars")
+            except PermissionError:
+                # Windows can't replace the snapshot this process still has mapped; index in memory instead
+                reloaded_catalog = ModCatalog.load(names_filepath, jars_filepath)
+                names, jars = [mod.name for mod in reloaded_catalog], [mod.jar for mod in reloaded_catalog]
+            previous = diff_catalogs(catalog, reloaded_catalog)
+
+            # A scan rewrites its report along with the mod files, so the flags may have changed as well
+            flagged_jars = load_flagged_jars(MOD_REPORT)
+            for button in buttons:
+                button.flagged = button.record.jar in flagged_jars
+            damage.add_full()  # Flags, removed rows and the scrollbar change in place, with nothing animating
+
+            if previous != list(range(len(catalog))):  # Not just touched
+                if DEBUG: print(f"Reloaded the mod list: {previous.count(-1)} added, "
+                                f"{len(catalog) - (len(previous) - previous.count(-1))} removed")
+                catalog = reloaded_catalog
+                mod_records = LazyRecords(len(catalog), create_record)
+                mod_list.reload(mod_records, catalog, previous, scroll_offset)
+                scrollbar.total_content_height = len(mod_records) * (button_height + button_spacing)
+
+                # Match against the new catalog, and show the current search again once that finishes
+                search_worker.stop()
+                search_worker = SearchWorker(ModSearch(names, jars, top_k=SEARCH_TOP_K).search, debounce=SEARCH_DEBOUNCE)
+                search_worker.submit(search_query)
+                if frame_time is not None:
+                    search_worker.wait()
+
+        # Apply the newest finished search
+        search_result = search_worker.poll()
+        if search_result:
+            _, result_query, matched = search_result
+            update_target_positions(result_query, matched, scroll_offset)
+
+        # Update hover state
+        state_manager.update_hover_state(mouse_pos, scroll_px)  # Against the list as it was drawn
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                damage.add_full()
+
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                # print("Window lost focus")
+                bring_window_to_foreground()
+
+            # Handle mouse button down events
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:  # Left mouse button
+                    state_manager.handle_mouse_down()
+                    if search_bar.icon_rect.collidepoint(event.pos):  # Check if clicked on magnifying glass
+                        search_bar.toggle()  # Toggle the search bar state
+
+                    if scrollbar.thumb_rect.collidepoint(mouse_pos):
+                        is_dragging = True
+                        drag_offset = mouse_pos[1] - scrollbar.thumb_rect.y
+                    elif search_bar.rect.collidepoint(mouse_pos):
+                        search_active = True
+                        pygame.mouse.set_visible(cursor_image is None)  # Ensure system cursor is hidden
+                    else:
+                        search_active = False
+                        pygame.mouse.set_visible(cursor_image is None)  # Ensure system cursor is hidden elsewhere
+
+                    # Check if a button is clicked
+                    button = mod_list.hit_test(mouse_pos, scroll_px)
+                    if button:
+                        mod_jar = button.record.mod.jar  # Direct lookup, no search through the mod data
+                        press_btn_sound.play()
+                        google_search_url = f"https://www.google.com/search?q={mod_jar.replace(' ', '+')}"
+                        threading.Thread(target=open_url, args=(google_search_url,), daemon=True).start()
+
+            # Handle mouse button up events
+            elif event.type == pygame.MOUSEBUTTONUP:
+                is_dragging = False
+                if event.button == 1:
+                    state_manager.handle_mouse_up()
+
+            # Handle mouse wheel scrolling
+            elif event.type == pygame.MOUSEWHEEL:
+                if event.y > 0:  # Scroll up
+                    scroll_velocity -= scroll_speed
+                elif event.y < 0:  # Scroll down
+                    scroll_velocity += scroll_speed
+
+                # Clamp scroll offset
+                max_scroll = scrollbar.total_content_height - scrollbar.visible_height
+                scroll_offset = max(0, min(scroll_offset, max_scroll))
+
+            # Handle mouse motion (dragging the scrollbar)
+            elif event.type == pygame.MOUSEMOTION and is_dragging:
+                # Move the thumb based on mouse movement
+                new_thumb_y = mouse_pos[1] - drag_offset
+
+                # Clamp thumb inside scrollbar area
+                thumb_height = scrollbar.thumb_rect.height
+                new_thumb_y = max(scrollbar.rect.y, min(scrollbar.rect.y + scrollbar.rect.height - thumb_height, new_thumb_y))
+
+                # Calculate the scroll offset based on thumb position
+                track_height = scrollbar.rect.height - thumb_height
+                scroll_percentage = (new_thumb_y - scrollbar.rect.y) / track_height if track_height > 0 else 0
+                max_scroll = scrollbar.total_content_height - scrollbar.visible_height
+                scroll_offset = step_scroll_offset = scroll_percentage * max_scroll  # Follow the thumb without interpolation
+
+            # Profiler hotkeys: F3 toggles profiling and its overlay, F4 saves a trace
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()
+                damage.add_full()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                profiler.export_trace(PROFILE_TRACE_FILE)
+                if DEBUG: print(f"Saved {len(profiler.trace)} frames to {PROFILE_TRACE_FILE}")
+
+            # Handle key presses for the search bar
+            elif event.type == pygame.KEYDOWN and search_active:
+                ctrl = pygame.key.get_mods() & pygame.KMOD_CTRL
+                shift = pygame.key.get_mods() & pygame.KMOD_SHIFT
+
+                if ctrl and event.key == pygame.K_a:
+                    # Ctrl+A select all
+                    search_field.select_all()
+                elif ctrl and event.key == pygame.K_z:
+                    # Ctrl+Z undo
+                    search_field.undo()
+                elif ctrl and event.key == pygame.K_v:
+                    # Ctrl+V paste
+                    search_field.insert(read_clipboard())
                 elif event.key == pygame.K_LEFT:
-                    if cursor_position > 0:
-                        cursor_position -= 1
-                        selection_start = selection_end = cursor_position
+                    # Shift + Left Arrow extends the selection to the left
+                    search_field.move(-1, extend=shift)
                 elif event.key == pygame.K_RIGHT:
-                    if cursor_position < len(search_query):
-                        cursor_position += 1
-                        selection_start = selection_end = cursor_position
+                    # Shift + Right Arrow extends the selection to the right
+                    search_field.move(1, extend=shift)
+                elif event.key == pygame.K_BACKSPACE:
+                    # Delete the selection or the character before the cursor
+                    search_field.backspace()
                 else:
-                    if selection_start != selection_end:
-                        # Replace selected text
-                        start, end = sorted([selection_start, selection_end])
-                        undo_stack.append((search_query, cursor_position))
-                        search_query = search_query[:start] + event.unicode + search_query[end:]
-                        cursor_position = start + 1
-                        selection_start = selection_end = cursor_position
-                    else:
-                        # Insert character at cursor position
-                        undo_stack.append((search_query, cursor_position))
-                        search_query = search_query[:cursor_position] + event.unicode + search_query[cursor_position:]
-                        cursor_position += 1
-                        selection_start = selection_end = cursor_position
-
-            # Reset scroll position to the top when the search query changes
-            scroll_offset = 0
-
-            # Update target positions and fade logic
-            update_target_positions(buttons, search_query, button_spacing)
-            update_button_positions_and_fade(buttons, scroll_offset)
-
-    # Track if the search query changed
-    if search_query != previous_search_query:
-        previous_search_query = search_query
-        if DEBUG: print(f"Search query changed to: '{search_query}'")
-        update_target_positions(buttons, search_query, button_spacing)
-
-
-    # Update search bar animation
-    search_bar.update()
-
-    # Set a clipping rectangle to restrict rendering to below the search bar
-    update_button_positions_and_fade(buttons, scroll_offset)
-
-    # Apply inertia/friction to scrolling
-    if abs(scroll_velocity) > 0.1:
-        scroll_offset += scroll_velocity
-        scroll_velocity *= 0.9  # Gradual deceleration for smooth scrolling
-        max_scroll = scrollbar.total_content_height - scrollbar.visible_height
-        scroll_offset = max(0, min(scroll_offset, max_scroll))
-    else:
-        scroll_velocity = 0
-
-    max_scroll = scrollbar.total_content_height - scrollbar.visible_height
-    scroll_offset = max(0, min(scroll_offset, max_scroll))
-
-    # Debug scroll offset
-    state_manager.debug_scroll(scroll_offset)
-
-    # Measure FPS
-    fps = clock.get_fps()
-    pygame.display.set_caption(f"Fable Mod List - FPS: {int(fps)}")
-
-    # Draw the background image
-    WINDOW.blit(background_image, (0, 0))
-
-    # Rendering logic
-    update_and_draw_particles(particles, WINDOW, 900, 700, dt)
-    search_bar.draw(WINDOW, search_query, cursor_position)
-    scrollbar.draw(WINDOW, scroll_offset)
-
-    
-    # Render the buttons
-    for button in buttons:
-        is_hovered = (state_manager.hovered_button == button)
-        button.draw(WINDOW, hovered=is_hovered, scroll_offset=scroll_offset)
-
-    # Reset the clipping rectangle
-    WINDOW.set_clip(None)
-    
-    # Render the custom cursor on top of everything
-    cursor_offset = (cursor_image.get_width() // 2, cursor_image.get_height() // 2)
-    WINDOW.blit(cursor_image, (mouse_pos[0] - cursor_offset[0], mouse_pos[1] - cursor_offset[1]))
-    
-    pygame.display.flip()
-    clock.tick(230)
-
-pygame.quit()
+                    # Insert the character at the cursor, replacing any selection
+                    search_field.insert(event.unicode)
+                search_query = search_field.text
+
+                # Reset scroll position to the top when the search query changes
+                scroll_offset = step_scroll_offset = 0
+
+        # Track if the search query changed
+        if search_query != previous_search_query:
+            previous_search_query = search_query
+            if DEBUG: print(f"Search query changed to: '{search_query}'")
+            search_worker.submit(search_query)
+            if frame_time is not None:
+                search_worker.wait()  # Results always arrive on the next frame
+        if profiling: profiler.mark("events")
+
+
+        # Advance the animations in fixed steps, however long the frame took
+        now = time.perf_counter()
+        accumulator += min(now - step_time, MAX_FRAME_TIME) if frame_time is None else frame_time
+        step_time = now
+        while accumulator >= step:
+            accumulator -= step
+            step_scroll_offset = scroll_offset
+
+            # Update search bar animation
+            search_bar.update(step)
+
+            # Materialize, fade and move the buttons near the viewport
+            mod_list.update(scroll_offset, step)
+
+            # Apply inertia/friction to scrolling
+            if abs(scroll_velocity) > scroll_stop_speed:
+                scroll_offset += scroll_velocity * step
+                scroll_velocity *= math.exp(-scroll_friction * step)  # Gradual deceleration for smooth scrolling
+                max_scroll = scrollbar.total_content_height - scrollbar.visible_height
+                scroll_offset = max(0, min(scroll_offset, max_scroll))
+            else:
+                scroll_velocity = 0
+
+            max_scroll = scrollbar.total_content_height - scrollbar.visible_height
+            scroll_offset = max(0, min(scroll_offset, max_scroll))
+
+            # Update animations
+            if profiling: profiler.mark("update")
+            particles.update(step)
+            if profiling: profiler.mark("particles")
+
+        # Draw between the last two steps, so motion stays smooth at any frame rate
+        blend = accumulator / step
+        view_offset = step_scroll_offset + (scroll_offset - step_scroll_offset) * blend
+        # Truncated once, so the buttons and their damaged rects can never be a pixel apart
+        scroll_px = int(view_offset)
+        mod_list.interpolate(blend)
+
+        # Debug scroll offset
+        state_manager.debug_scroll(scroll_offset)
+
+        # Show the FPS in the caption, once a second rather than every frame
+        now = time.perf_counter()
+        if now - caption_time >= 1.0:
+            pygame.display.set_caption(f"Fable Mod List - FPS: {int(clock.get_fps())}")
+            caption_time = now
+        if profiling: profiler.mark("update")
+
+        search_animating = search_bar.is_animating()
+        list_animating = mod_list.is_animating()
+
+        # --- Track damaged regions ---
+        cursor_rect = None  # The system cursor is shown until the custom one has loaded
+        if cursor_image is not None:
+            cursor_offset = (cursor_image.get_width() // 2, cursor_image.get_height() // 2)
+            cursor_rect = pygame.Rect(mouse_pos[0] - cursor_offset[0], mouse_pos[1] - cursor_offset[1], *cursor_image.get_size())
+        if cursor_rect and cursor_rect != previous_cursor_rect:
+            damage.add(cursor_rect)
+            if previous_cursor_rect:
+                damage.add(previous_cursor_rect)
+            previous_cursor_rect = cursor_rect
+
+        search_rect = search_bar.rect.copy()
+        search_input = any(event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN) for event in events)
+        if search_input or search_animating or search_result or search_worker.searching or search_rect != previous_search_rect:
+            damage.add(search_rect)
+            if previous_search_rect:
+                damage.add(previous_search_rect)
+            previous_search_rect = search_rect
+
+        # The step that settles the list changes it one last time, so it is redrawn once more after animating stops
+        if list_animating or previous_list_animating or view_offset != previous_scroll_offset:
+            damage.add((0, search_rect.bottom, WINDOW.get_width(), WINDOW.get_height() - search_rect.bottom))
+            damage.add(scrollbar.rect)
+            previous_scroll_offset = view_offset
+        previous_list_animating = list_animating
+
+        hovered = state_manager.hovered_button
+        hovered_rect = mod_list.screen_rect(hovered, scroll_px) if hovered else None
+        if hovered_rect != previous_hovered_rect:
+            for rect in (hovered_rect, previous_hovered_rect):
+                if rect:
+                    damage.add(rect)
+            previous_hovered_rect = hovered_rect
+
+        particle_bounds = particles.bounds(blend)
+        damage.add_many(*particle_bounds)
+        if previous_particle_bounds is not None:
+            damage.add_many(*previous_particle_bounds)
+        previous_particle_bounds = particle_bounds
+
+        if profiling:
+            damage.add(profiler_rect)  # The overlay is redrawn over whatever changed beneath it
+
+        dirty = damage.rects() if DIRTY_RENDERING else [WINDOW.get_rect()]
+        if profiling: profiler.mark("damage")
+        if dirty:
+            # Redraw every damaged rect on its own, so scattered damage (particles) never grows into
+            # one big redraw. Each layer is drawn into all the rects it overlaps before the next
+            # layer; the rects don't overlap each other, so the result is the same as rect by rect.
+            # Draw the background image
+            for rect in dirty:
+                if background_image is not None:
+                    WINDOW.blit(background_image, rect, area=rect)
+                else:
+                    WINDOW.fill(BG_COLOR, rect)
+            if profiling: profiler.mark("background")
+
+            # Rendering logic
+            particles.draw(WINDOW, blend, areas=dirty)
+            if profiling: profiler.mark("particles")
+            draw_in(dirty, search_rect, search_bar.draw, WINDOW, searching=search_worker.searching)
+            if profiling: profiler.mark("search_bar")
+            draw_in(dirty, scrollbar.rect, scrollbar.draw, WINDOW, view_offset)
+
+            # Render the buttons
+            for button in buttons:
+                is_hovered = (state_manager.hovered_button == button)
+                draw_in(dirty, mod_list.screen_rect(button, scroll_px), button.draw, WINDOW, hovered=is_hovered, scroll_offset=scroll_px)
+
+            # Render the custom cursor on top of everything
+            if cursor_image is not None:
+                draw_in(dirty, cursor_rect, WINDOW.blit, cursor_image, cursor_rect)
+            if profiling:
+                profiler.mark("buttons")
+                draw_in(dirty, profiler_rect, profiler.draw, WINDOW)
+
+            # Reset the clipping rectangle
+            WINDOW.set_clip(None)
+
+        if DIRTY_RENDERING:
+            pygame.display.update(dirty)
+        else:
+            damage.clear()
+            pygame.display.flip()
+        if profiling: profiler.mark("flip")
+
+        # Nothing to animate and no input: the next frame may wait for events
+        idle = not (events or is_dragging or scroll_velocity or search_animating or list_animating or search_worker.searching)
+        frame_wall = time.perf_counter()
+        frame_cpu = time.process_time()
+        cpu_time[idle] += frame_cpu - cpu_start
+        wall_time[idle] += frame_wall - wall_start
+        cpu_start, wall_start = frame_cpu, frame_wall
+
+        # Report CPU time per second for idle and active frames
+        if DEBUG and frame_wall - report_time >= 1.0:
+            for state in (False, True):
+                if wall_time[state]:
+                    print(f"{'Idle' if state else 'Active'} CPU: {1000 * cpu_time[state] / wall_time[state]:.0f} ms/s "
+                          f"over {wall_time[state]:.1f} s")
+            cpu_time = {True: 0.0, False: 0.0}
+            wall_time = {True: 0.0, False: 0.0}
+            report_time = frame_wall
+
+        clock.tick(frame_rate)
+        if profiling:
+            profiler.mark("sleep")
+            profiler.end_frame()
+
+        # Scripted runs (benchmarks) get a hook after every frame and may stop early
+        frame += 1
+        if on_frame:
+            on_frame(frame)
+        if max_frames is not None and frame >= max_frames:
+            running = False
+
+    search_worker.stop()
+    assets.shutdown()
+    if recorder:
+        recorder.save(record_filepath)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
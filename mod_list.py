@@ -0,0 +1,454 @@
+import bisect
+import math
+
+import numpy as np
+
+
+class ModRecord:
+    """
+    Lightweight per-mod record of a single mod in the list.
+
+    Records exist for every line of the catalog that has been needed, while
+    `Button` objects are only materialized for the records that are in (or
+    near) the viewport. Animation state lives in `ButtonStates`, indexed by
+    the record's index.
+    """
+
+    __slots__ = ("index", "mod", "block_type", "button")
+
+    def __init__(self, index, mod, block_type):
+        self.index = index
+        self.mod = mod  # The catalog's ModInfo
+        self.block_type = block_type
+        self.button = None  # Bound Button while the record is on screen
+
+    @property
+    def name(self):
+        return self.mod.name
+
+    @property
+    def jar(self):
+        return self.mod.jar
+
+
+class ButtonStates:
+    FIELDS = {
+        "index": np.intp,  # Record index of the row in each slot
+        "y": np.float64,
+        "previous_y": np.float64,  # y before the last simulation step, for interpolation
+        "draw_y": np.float64,  # y the row is drawn at, between the last two steps
+        "target_y": np.float64,
+        "search_alpha": np.float64,
+        "onscreen_alpha": np.int32,
+        "alpha": np.int32,
+        "is_match": bool,
+    }
+
+    def __init__(self, capacity=64):
+        """
+        Animation state of the bound rows, in contiguous arrays.
+
+        Every bound row owns one slot, and slots are kept packed at the
+        front, so a simulation step updates all of them with a handful of
+        operations on `[:count]` slices. Buttons read their position and
+        alpha straight from their slot.
+
+        Args:
+            capacity (int): Initial number of slots; grows as needed.
+        """
+        self.count = 0
+        self.capacity = 0
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        for name, dtype in self.FIELDS.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if self.capacity:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, index):
+        """
+        Give a row a slot.
+
+        Args:
+            index (int): The row's record index.
+
+        Returns:
+            int: The slot.
+        """
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        slot = self.count
+        self.index[slot] = index
+        self.count += 1
+        return slot
+
+    def remove(self, slot):
+        """
+        Free a slot by moving the last row into it.
+
+        Args:
+            slot (int): The slot to free.
+
+        Returns:
+            int: Record index of the row that moved into the slot, or None if none did.
+        """
+        self.count -= 1
+        last = self.count
+        if slot == last:
+            return None
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[slot] = array[last]
+        return int(self.index[slot])
+
+
+class LazyRecords:
+    def __init__(self, count, record_factory):
+        """
+        A sequence of ModRecord objects that are created on first access.
+
+        Args:
+            count (int): Number of records.
+            record_factory (callable): Creates the ModRecord for a given index.
+        """
+        self.count = count
+        self.record_factory = record_factory
+        self.created = {}  # index -> ModRecord
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        record = self.created.get(index)
+        if record is None:
+            if not 0 <= index < self.count:
+                raise IndexError("record index out of range")
+            record = self.created[index] = self.record_factory(index)
+        return record
+
+
+class VirtualModList:
+    def __init__(self, records, button_factory, start_y, row_height, button_height,
+                 onscreen_top, onscreen_bottom, fade_margin, fade_range, overscan=2,
+                 move_rate=51.3, fade_speed=3450):
+        """
+        Initialize the virtualized mod list.
+
+        Args:
+            records (sequence): The ModRecord objects, in catalog order (a list or LazyRecords).
+            button_factory (callable): Creates a Button for a given ModRecord.
+            start_y (int): The y-position of the first row.
+            row_height (int): Button height plus spacing.
+            button_height (int): Height of a button.
+            onscreen_top (int): Top edge of the fully visible area.
+            onscreen_bottom (int): Bottom edge of the fully visible area.
+            fade_margin (int): Distance past the edges where buttons are hidden.
+            fade_range (int): Distance over which buttons fade at the edges.
+            overscan (int): Extra rows materialized above and below the window.
+            move_rate (float): How fast buttons ease toward their row: the remaining distance
+                shrinks by a factor of e every 1/move_rate seconds.
+            fade_speed (float): Search fade speed, in alpha per second.
+        """
+        self.records = records
+        self.button_factory = button_factory
+        self.start_y = start_y
+        self.row_height = row_height
+        self.button_height = button_height
+        self.onscreen_top = onscreen_top
+        self.onscreen_bottom = onscreen_bottom
+        self.fade_margin = fade_margin
+        self.fade_range = fade_range
+        self.overscan = overscan
+        self.move_rate = move_rate
+        self.fade_speed = fade_speed
+
+        self.state = ButtonStates()
+        self.last_target_y = start_y + np.arange(len(records), dtype=np.float64) * row_height  # Where unbound rows were last laid out
+        self.layout = np.arange(len(records))  # Indices of the matching records, in display order
+        self.rank = np.arange(len(records))  # Display position of every record, -1 if not matching
+        self.previous_rank = self.rank.copy()
+        self.row_tops = self.start_y + self.layout * row_height  # Sorted top edge of every laid-out row
+        self.animate_in = set()  # Unbound records that slide in from their previous position
+        self.active = {}  # record.index -> ModRecord for every bound record
+        self.buttons = []  # Bound buttons, updated in place when the active set changes
+        self.animating = False  # Whether a bound row was still moving or fading after the last step
+        self.updated_offset = None  # Scroll offset of the last step
+
+    def visible_range(self, scroll_offset):
+        """
+        Get the slice of the layout that falls inside the viewport.
+
+        Args:
+            scroll_offset (int): The current scroll offset.
+
+        Returns:
+            tuple: (first, last) layout indices, last exclusive.
+        """
+        top = scroll_offset + self.onscreen_top - self.fade_margin - self.start_y
+        bottom = scroll_offset + self.onscreen_bottom + self.fade_margin - self.start_y
+        first = max(0, int(top // self.row_height) - self.overscan)
+        last = min(len(self.layout), int(bottom // self.row_height) + 1 + self.overscan)
+        return first, max(first, last)
+
+    def set_layout(self, matched, scroll_offset=0):
+        """
+        Lay out the matching records.
+
+        Only bound records are touched here; everything else picks up its
+        new state lazily when it is materialized, so the cost does not
+        depend on the catalog size.
+
+        Args:
+            matched (numpy.ndarray): Indices of the matching records, in display order.
+            scroll_offset (int): The scroll offset the new layout is shown at.
+        """
+        self.previous_rank, self.rank = self.rank, self.previous_rank
+        self.rank[:] = -1
+        self.rank[matched] = np.arange(len(matched))
+        self.layout = matched
+        self.row_tops = self.start_y + np.arange(len(matched)) * self.row_height
+
+        # Retarget the bound rows
+        state = self.state
+        count = state.count
+        rank = self.rank[state.index[:count]]
+        state.is_match[:count] = rank >= 0
+        np.copyto(state.target_y[:count], self.start_y + rank * self.row_height, where=rank >= 0)
+        self.animating = True
+
+        # Rows that will be on screen keep animating from where they were,
+        # everything else jumps straight to its final state when bound.
+        first, last = self.visible_range(scroll_offset)
+        self.animate_in = {int(index) for index in matched[first:last] if index not in self.active}
+
+    def reload(self, records, mods, previous, scroll_offset=0):
+        """
+        Switch to a reloaded catalog, keeping the rows of the mods that are still in it.
+
+        Records of kept mods move to their new index with their block type,
+        and bound ones keep their Button (texture and fitted text) and
+        animation slot. Only the buttons of removed mods are dropped; added
+        mods are materialized like any other row once they are laid out in
+        view. Until the next `set_layout`, the kept rows stay in their
+        current order and close the gaps left by removed ones.
+
+        Args:
+            records (LazyRecords): The records of the new catalog, none created yet.
+            mods (sequence): The new catalog's ModInfo entries.
+            previous (sequence): Index in the old catalog of every new mod, -1 if it was added
+                (see `catalog.diff_catalogs`).
+            scroll_offset (int): The scroll offset the list is shown at.
+        """
+        previous = np.asarray(previous, dtype=np.intp)
+        kept = np.flatnonzero(previous >= 0)
+        renumber = np.full(len(self.records), -1)  # Old index -> new index, -1 if removed
+        renumber[previous[kept]] = kept
+
+        # Drop the buttons of removed mods while the old records are still in place
+        for record in list(self.active.values()):
+            if renumber[record.index] < 0:
+                self._release(record)
+
+        # Move the kept records to their new index
+        for old_index, record in self.records.created.items():
+            index = int(renumber[old_index])
+            if index >= 0:
+                record.index = index
+                record.mod = mods[index]
+                records.created[index] = record
+        state = self.state
+        state.index[:state.count] = renumber[state.index[:state.count]]
+        self.active = {record.index: record for record in self.active.values()}
+        self.records = records
+
+        last_target_y = self.start_y + np.arange(len(records), dtype=np.float64) * self.row_height
+        last_target_y[kept] = self.last_target_y[previous[kept]]
+        self.last_target_y = last_target_y
+
+        # Lay out the kept rows in their current order, animating from their current rows
+        rank = np.full(len(records), -1)
+        rank[kept] = self.rank[previous[kept]]
+        self.rank, self.previous_rank = rank, np.empty_like(rank)
+        layout = renumber[self.layout]
+        self.set_layout(layout[layout >= 0], scroll_offset)
+        self.updated_offset = None
+        self.buttons[:] = [record.button for record in self.active.values()]
+
+    def _target_y(self, index, ranks):
+        rank = int(ranks[index])
+        return (self.start_y + rank * self.row_height if rank >= 0 else float(self.last_target_y[index])), rank >= 0
+
+    def _bind(self, record):
+        index = record.index
+        target_y, is_match = self._target_y(index, self.rank)
+        if index in self.animate_in:
+            # Start from the settled state under the previous layout
+            y, was_match = self._target_y(index, self.previous_rank)
+        else:
+            y, was_match = target_y, is_match
+
+        state = self.state
+        slot = state.add(index)
+        state.y[slot] = state.previous_y[slot] = state.draw_y[slot] = y
+        state.target_y[slot] = target_y
+        state.search_alpha[slot] = 255.0 if was_match else 0.0
+        state.is_match[slot] = is_match
+        state.onscreen_alpha[slot] = state.alpha[slot] = 0  # Set by the next step
+
+        record.button = self.button_factory(record)
+        record.button.record = record
+        record.button.bind_state(state, slot)
+        self.active[index] = record
+
+    def _release(self, record):
+        state = self.state
+        slot = record.button.slot
+        self.last_target_y[record.index] = state.target_y[slot]
+        moved = state.remove(slot)
+        if moved is not None:
+            self.records[moved].button.slot = slot
+        record.button = None
+        del self.active[record.index]
+
+    def screen_rect(self, button, scroll_offset):
+        """
+        Get where a bound button is drawn in window coordinates.
+
+        Args:
+            button (Button): A bound button.
+            scroll_offset (int): The current scroll offset.
+
+        Returns:
+            pygame.Rect: The button's rectangle as drawn.
+        """
+        return button.rect.move(0, int(self.state.draw_y[button.slot]) - button.rect.y - scroll_offset)
+
+    def hit_test(self, pos, scroll_offset):
+        """
+        Find the visible button under a point with a binary search over the rows.
+
+        Args:
+            pos (tuple): The point in window coordinates (x, y).
+            scroll_offset (int): The current scroll offset.
+
+        Returns:
+            Button: The button under the point, or None.
+        """
+        x, y = pos
+        content_y = y + scroll_offset
+        row = bisect.bisect_right(self.row_tops, content_y) - 1
+        if row < 0:
+            return None
+
+        # Buttons may still be easing toward their row, so check the neighbours as well. Only bound
+        # rows can be hit, so unbound ones are skipped without creating their records
+        state = self.state
+        for index in self.layout[max(0, row - 1):row + 2].tolist():
+            record = self.active.get(index)
+            if record is None:
+                continue
+            button = record.button
+            if state.alpha[button.slot] > 0:
+                rect = button.rect
+                top = int(state.draw_y[button.slot])
+                if rect.x <= x < rect.right and top <= content_y < top + rect.height:
+                    return button
+        return None
+
+    def is_animating(self):
+        """
+        Check whether any materialized button is still moving or fading.
+
+        Returns:
+            bool: True while at least one bound record has not settled.
+        """
+        return self.animating
+
+    def update(self, scroll_offset, dt):
+        """
+        Materialize buttons for the visible rows, then fade and move them.
+
+        Rows that left the window and faded out are released, and a step
+        where nothing is bound, moving or scrolled is skipped entirely.
+
+        Args:
+            scroll_offset (int): The current scroll offset.
+            dt (float): Length of the simulation step, in seconds.
+        """
+        first, last = self.visible_range(scroll_offset)
+        changed = False
+        for index in self.layout[first:last].tolist():
+            record = self.records[index]
+            if record.button is None:
+                self._bind(record)
+                changed = True
+        self.animate_in.clear()
+        if not (changed or self.animating or scroll_offset != self.updated_offset):
+            return  # Every bound row is settled and nothing scrolled
+        self.updated_offset = scroll_offset
+
+        state = self.state
+        count = state.count
+        target_y = state.target_y[:count]
+        search_alpha = state.search_alpha[:count]
+
+        if changed or self.animating:
+            # --- Search alpha steps toward 255 for matches and 0 for the rest ---
+            fade = self.fade_speed * dt
+            search_alpha += np.where(state.is_match[:count], fade, -fade)
+            np.clip(search_alpha, 0, 255, out=search_alpha)
+
+            # --- Move smoothly toward target_y ---
+            y = state.y[:count]
+            previous_y = state.previous_y[:count]
+            previous_y[:] = y
+            dy = target_y - y
+            ease = 1 - math.exp(-self.move_rate * dt)  # Fraction of the distance covered this step
+            y += dy * ease
+            settled = np.abs(dy) <= 1
+            y[settled] = target_y[settled]
+
+            # Still moving, or a search fade has not reached 0 or 255 yet
+            self.animating = bool((previous_y != y).any() or ((search_alpha > 0) & (search_alpha < 255)).any())
+
+        # --- Onscreen alpha: fade out past the edges, hidden beyond the margin ---
+        # (always calculated from the target position)
+        distance = np.maximum(
+            (self.onscreen_top - self.button_height + scroll_offset) - target_y,  # Above the top edge
+            target_y - (self.onscreen_bottom + scroll_offset),  # Below the bottom edge
+        )
+        hidden = distance > self.fade_margin
+        np.clip(distance * (255 / self.fade_range), 0, 255, out=distance)
+        onscreen_alpha = state.onscreen_alpha[:count]
+        onscreen_alpha[:] = 255 - np.floor(distance, out=distance)
+        onscreen_alpha[hidden] = 0
+
+        # --- Final alpha ---
+        alpha = state.alpha[:count]
+        np.minimum(search_alpha, onscreen_alpha, out=alpha, casting="unsafe")
+
+        # Release rows that left the window and finished fading out
+        rank = self.rank[state.index[:count]]
+        released = (alpha == 0) & ((rank < first) | (rank >= last))
+        if released.any():
+            for index in state.index[:count][released].tolist():
+                self._release(self.records[index])
+            changed = True
+
+        if changed:
+            self.buttons[:] = [record.button for record in self.active.values()]
+
+    def interpolate(self, blend):
+        """
+        Place the bound rows between their last two simulated positions.
+
+        Args:
+            blend (float): How far the frame is into the next simulation step, from 0 to 1.
+        """
+        state = self.state
+        count = state.count
+        previous_y = state.previous_y[:count]
+        np.add(previous_y, (state.y[:count] - previous_y) * blend, out=state.draw_y[:count])
@@ -0,0 +1,170 @@
+import numpy as np
+import pygame
+
+BOB_SPEED = 115.0  # Peak vertical speed of the up/down bobbing, in pixels per second
+
+
+class ParticleSystem:
+    def __init__(self, count, width, height, seed=None, brightness_levels=8, alpha_levels=16):
+        """
+        Initialize the twinkling particle effect.
+
+        Particle state lives in NumPy arrays so a frame is a handful of
+        vectorized operations, and drawing blits from a small cache of
+        pre-rendered sprites instead of building a surface per particle.
+
+        Args:
+            count (int): Number of particles.
+            width (int): Width of the area particles move through.
+            height (int): Height of the area particles move through.
+            seed (int): Seed for reproducible particles, or None for random ones.
+            brightness_levels (int): Brightness steps sprites are quantized to.
+            alpha_levels (int): Alpha steps sprites are quantized to.
+        """
+        self.count = count
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.brightness_levels = brightness_levels
+        self.alpha_levels = alpha_levels
+
+        # -1 for right-to-left, 1 for left-to-right
+        self.direction = self.rng.choice(np.array([-1.0, 1.0]), size=count)
+        self.x = np.where(
+            self.direction == 1,
+            self.rng.uniform(0, width, count),
+            self.rng.uniform(-50, 0, count),  # Start slightly off-screen
+        )
+        self.y = np.empty(count)
+        self.previous_x = self.x.copy()  # Positions before the last update, for interpolation
+        self.previous_y = np.empty(count)
+        self.vx = np.empty(count)
+        self.size = np.empty(count)
+        self.brightness = np.empty(count)
+        self.lifetime = np.empty(count)
+        self.age = np.zeros(count)
+        self.phase = np.empty(count)
+        self.alpha = np.full(count, 255.0)
+        self._randomize(np.ones(count, dtype=bool))
+        self.previous_y[:] = self.y
+
+        # Sprite cache indexed by [size, brightness bucket, alpha bucket]
+        self.sprites = np.empty((3, brightness_levels, alpha_levels), dtype=object)
+
+    def _randomize(self, mask):
+        n = int(np.count_nonzero(mask))
+        self.y[mask] = self.rng.uniform(0, self.height, n)  # Random vertical position
+        self.vx[mask] = self.rng.uniform(23, 115, n) * self.direction[mask]  # Slow horizontal speed, pixels per second
+        self.size[mask] = self.rng.uniform(1, 3, n)  # Size variation for depth illusion
+        self.brightness[mask] = self.rng.integers(150, 256, n)
+        self.lifetime[mask] = self.rng.uniform(5.0, 10.0, n)  # Lifetime in seconds
+        self.age[mask] = 0.0
+        self.phase[mask] = self.rng.uniform(0, np.pi * 2, n)  # For smoother up/down sinusoidal bobbing
+
+    def update(self, dt):
+        """
+        Advance every particle by one simulation step.
+
+        Args:
+            dt (float): Length of the step, in seconds.
+        """
+        self.previous_x[:] = self.x
+        self.previous_y[:] = self.y
+        self.age += dt
+
+        # Respawn particles whose lifetime ended or that moved off-screen
+        expired = (self.age >= self.lifetime) | (self.x < -50) | (self.x > self.width + 50)
+        if expired.any():
+            n = int(np.count_nonzero(expired))
+            self.x[expired] = np.where(
+                self.direction[expired] == 1,
+                self.rng.uniform(-50, 0, n),
+                self.rng.uniform(self.width, self.width + 50, n),
+            )
+            self._randomize(expired)
+            self.previous_x[expired] = self.x[expired]  # Respawn in place, don't streak across the screen
+            self.previous_y[expired] = self.y[expired]
+
+        # Bob up and down using a sine wave, drift horizontally
+        self.y += np.sin(self.phase + self.age * 2.0) * BOB_SPEED * dt
+        self.x += self.vx * dt
+
+        # Fade out over the lifetime
+        self.alpha = np.clip(255.0 * (1.0 - self.age / self.lifetime), 0, 255)
+
+    def positions(self, blend=1.0):
+        """
+        Get the particle positions between the last two updates.
+
+        Args:
+            blend (float): How far the frame is into the next update, from 0 (previous) to 1 (latest).
+
+        Returns:
+            tuple: (xs, ys) arrays.
+        """
+        if blend == 1.0:
+            return self.x, self.y
+        return self.previous_x + (self.x - self.previous_x) * blend, self.previous_y + (self.y - self.previous_y) * blend
+
+    def bounds(self, blend=1.0):
+        """
+        Get the squares the particles cover, for dirty-rect tracking.
+
+        Args:
+            blend (float): Interpolation between the last two updates, as for `positions`.
+
+        Returns:
+            tuple: (xs, ys, sizes) arrays, copied so later updates don't change them.
+        """
+        x, y = self.positions(blend)
+        return x.astype(np.intp), y.astype(np.intp), self.size.astype(np.intp) * 2
+
+    def _sprite(self, radius, brightness_bucket, alpha_bucket):
+        sprite = self.sprites[radius, brightness_bucket, alpha_bucket]
+        if sprite is None:
+            brightness = 150 + brightness_bucket * 105 // max(1, self.brightness_levels - 1)
+            alpha = alpha_bucket * 255 // max(1, self.alpha_levels - 1)
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (brightness, brightness, brightness, alpha), (radius, radius), radius)
+            self.sprites[radius, brightness_bucket, alpha_bucket] = sprite
+        return sprite
+
+    def draw(self, surface, blend=1.0, areas=None):
+        """
+        Draw every live particle.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+            blend (float): Interpolation between the last two updates, as for `positions`.
+            areas (list): Only draw inside these rects (e.g. the damaged regions), each clipped
+                separately, or None to draw everywhere.
+        """
+        x, y = self.positions(blend)
+        radius = self.size.astype(np.intp)
+        brightness = ((self.brightness - 150) * (self.brightness_levels - 1) / 105).round().astype(np.intp)
+        alpha = (self.alpha * (self.alpha_levels - 1) / 255).round().astype(np.intp)
+
+        # Skip particles that are fully faded or outside the surface
+        drawn = (alpha > 0) & (x > -6) & (x < surface.get_width()) & (y > -6) & (y < surface.get_height())
+        radius, brightness, alpha = radius[drawn], brightness[drawn], alpha[drawn]
+
+        sprites = self.sprites[radius, brightness, alpha]
+        for i in np.flatnonzero(np.equal(sprites, None)):
+            sprites[i] = self._sprite(radius[i], brightness[i], alpha[i])
+
+        x, y = x[drawn].astype(np.intp), y[drawn].astype(np.intp)
+        if areas is None:
+            surface.blits(zip(sprites.tolist(), zip(x.tolist(), y.tolist())), doreturn=False)
+            return
+
+        # Which particles overlap which area, for all of them at once
+        left, top, width, height = np.array([tuple(area) for area in areas], dtype=np.intp).reshape(-1, 4).T[:, :, None]
+        extent = radius * 2
+        overlaps = (x < left + width) & (x + extent > left) & (y < top + height) & (y + extent > top)
+
+        clip = surface.get_clip()
+        sprites, positions = sprites.tolist(), list(zip(x.tolist(), y.tolist()))
+        for area in np.flatnonzero(overlaps.any(axis=1)).tolist():
+            surface.set_clip(areas[area])
+            surface.blits([(sprites[i], positions[i]) for i in np.flatnonzero(overlaps[area]).tolist()], doreturn=False)
+        surface.set_clip(clip)
@@ -0,0 +1,190 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Main loop phases, in loop order, with their overlay colors
+FRAME_PHASES = {
+    "wait": (90, 90, 90),  # Blocking for input while idle
+    "events": (80, 160, 255),
+    "update": (255, 200, 60),  # Search bar, button positions and fade, scrolling
+    "particles": (200, 120, 255),
+    "damage": (120, 120, 120),  # Dirty-rect tracking
+    "background": (60, 120, 60),
+    "search_bar": (255, 140, 60),
+    "buttons": (80, 220, 120),
+    "flip": (255, 80, 80),
+    "sleep": (50, 50, 50),  # Frame rate cap
+}
+BUSY_PHASES = [phase for phase in FRAME_PHASES if phase not in ("wait", "sleep")]
+
+
+class FrameProfiler:
+    def __init__(self, history=600, enabled=False):
+        """
+        Initialize the per-phase frame profiler.
+
+        The main loop calls `mark(phase)` at the end of every phase, guarded
+        by `if profiling:`, so a disabled profiler costs one branch per mark.
+        Durations of the last `history` frames are kept in a ring buffer for
+        percentiles and the overlay graph, and their timestamps for trace
+        export.
+
+        Args:
+            history (int): Number of frames kept.
+            enabled (bool): Whether to start profiling right away.
+        """
+        self.history = history
+        self.enabled = enabled
+        self.phases = list(FRAME_PHASES)
+        self.phase_index = {phase: i for i, phase in enumerate(self.phases)}
+        self.durations = np.zeros((history, len(self.phases)))  # Seconds, one row per frame
+        self.frames = 0  # Frames recorded so far
+        self.current = np.zeros(len(self.phases))
+        self.spans = []  # (phase, start_ns, end_ns) of the current frame
+        self.trace = deque(maxlen=history)  # Spans of the recorded frames
+        self.last = time.perf_counter_ns()
+
+        self.font = None
+        self.overlay = None
+        self.overlay_frame = -1  # Frame the overlay surface was last drawn for
+
+    def toggle(self):
+        """
+        Turn profiling (and the overlay) on or off.
+        """
+        self.enabled = not self.enabled
+        self.last = time.perf_counter_ns()
+        self.current[:] = 0
+        self.spans = []
+
+    def mark(self, phase):
+        """
+        End a phase: the time since the previous mark is added to it.
+
+        Args:
+            phase (str): One of FRAME_PHASES.
+        """
+        now = time.perf_counter_ns()
+        self.current[self.phase_index[phase]] += (now - self.last) / 1e9
+        self.spans.append((phase, self.last, now))
+        self.last = now
+
+    def end_frame(self):
+        """
+        Store the current frame and start the next one.
+        """
+        self.durations[self.frames % self.history] = self.current
+        self.trace.append(self.spans)
+        self.frames += 1
+        self.current = np.zeros(len(self.phases))
+        self.spans = []
+
+    def recorded(self):
+        """
+        Get the durations of the recorded frames, oldest first.
+
+        Returns:
+            numpy.ndarray: Seconds, one row per frame and one column per phase.
+        """
+        count = min(self.frames, self.history)
+        start = self.frames % self.history if self.frames > self.history else 0
+        return np.roll(self.durations, -start, axis=0)[:count]
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """
+        Get rolling percentiles per phase over the recorded frames.
+
+        Returns:
+            dict: phase -> [milliseconds at each percentile], plus "frame" for busy time per frame.
+        """
+        durations = self.recorded()
+        if not len(durations):
+            return {}
+        results = {
+            phase: (np.percentile(durations[:, i], percents) * 1000).tolist()
+            for i, phase in enumerate(self.phases)
+        }
+        busy = durations[:, [self.phase_index[phase] for phase in BUSY_PHASES]].sum(axis=1)
+        results["frame"] = (np.percentile(busy, percents) * 1000).tolist()
+        return results
+
+    def export_trace(self, filepath):
+        """
+        Write the recorded frames as a Chrome trace (chrome://tracing, Perfetto).
+
+        Args:
+            filepath (str): Where to write the JSON trace.
+        """
+        events = []
+        for number, spans in enumerate(self.trace, start=max(0, self.frames - len(self.trace))):
+            if not spans:
+                continue
+            events.append({
+                "name": f"frame {number}", "ph": "X", "pid": 1, "tid": 1,
+                "ts": spans[0][1] / 1000, "dur": (spans[-1][2] - spans[0][1]) / 1000,
+            })
+            events.extend(
+                {"name": phase, "ph": "X", "pid": 1, "tid": 1, "ts": start / 1000, "dur": (end - start) / 1000}
+                for phase, start, end in spans
+            )
+        with open(filepath, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+    def draw(self, window, pos=(10, 10), size=(300, 200), frames=150, refresh=10):
+        """
+        Draw the overlay: a stacked per-phase bar per frame and the percentiles.
+
+        The overlay surface is only redrawn every `refresh` frames.
+
+        Args:
+            window (pygame.Surface): The surface to draw on.
+            pos (tuple): Top-left corner of the overlay.
+            size (tuple): Overlay size (width, height).
+            frames (int): Number of most recent frames graphed.
+            refresh (int): Frames between overlay redraws.
+
+        Returns:
+            pygame.Rect: The area drawn, for dirty-rect tracking.
+        """
+        if self.overlay is None or self.frames - self.overlay_frame >= refresh:
+            self.overlay = self._render_overlay(size, frames)
+            self.overlay_frame = self.frames
+        return window.blit(self.overlay, pos)
+
+    def _render_overlay(self, size, frames):
+        if self.font is None:
+            self.font = pygame.font.SysFont("consolas,menlo,dejavusansmono,couriernew", 13)  # Monospace for the table
+        width, height = size
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+
+        # Stacked bars, scaled so 1/60 s is half the graph height
+        graph_height = height // 2
+        scale = graph_height / 2 / (1 / 60)
+        durations = self.recorded()[-frames:]
+        bar_width = max(1, width // frames)
+        for x, row in enumerate(durations):
+            y = graph_height
+            for phase in BUSY_PHASES:
+                bar = int(row[self.phase_index[phase]] * scale)
+                if bar:
+                    pygame.draw.rect(overlay, FRAME_PHASES[phase], (x * bar_width, y - bar, bar_width, bar))
+                    y -= bar
+        pygame.draw.line(overlay, (255, 255, 255, 90), (0, graph_height // 2), (width, graph_height // 2))  # 60 FPS
+
+        # Percentile table for the busiest phases
+        percentiles = self.percentiles()
+        lines = [f"{'phase':<10} {'p50':>6} {'p95':>6} {'p99':>6} ms"]
+        for phase in ["frame"] + sorted(BUSY_PHASES, key=lambda phase: -percentiles.get(phase, [0])[0])[:5]:
+            if phase in percentiles:
+                p50, p95, p99 = percentiles[phase]
+                lines.append(f"{phase:<10} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        y = graph_height + 4
+        for line in lines:
+            color = FRAME_PHASES.get(line.split(" ", 1)[0], (255, 255, 255))
+            overlay.blit(self.font.render(line, True, color), (6, y))
+            y += self.font.get_linesize()
+        return overlay
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# Defaults match main.py, but are resolved next to this script so it works from any folder
+REPOSITORY = os.path.dirname(os.path.abspath(__file__))
+MOD_NAMES_FILE = os.path.join(REPOSITORY, "data/mod_names.txt")
+MOD_JARS_FILE = os.path.join(REPOSITORY, "data/mod_jar.txt")
+CATALOG_SNAPSHOT = os.path.join(REPOSITORY, "data/mod_catalog.snapshot")
+SEARCH_TOP_K = 200  # Same ranking as the search bar
+DEFAULT_LIMIT = 10  # Results printed per query
+
+
+class ModQuery:
+    def __init__(self, names_filepath=MOD_NAMES_FILE, jars_filepath=MOD_JARS_FILE,
+                 snapshot_filepath=CATALOG_SNAPSHOT, top_k=SEARCH_TOP_K):
+        """
+        Search the mod list without the window.
+
+        Uses the catalog snapshot and the same ModSearch as the search bar,
+        so results match the app exactly. Only the catalog and search
+        modules are imported (never pygame or main.py), and only when the
+        first query runs.
+
+        Args:
+            names_filepath (str): Path to the mod names file.
+            jars_filepath (str): Path to the mod jar file names.
+            snapshot_filepath (str): Path to the compiled catalog snapshot.
+            top_k (int): Number of best matches ranked by score.
+        """
+        self.names_filepath = names_filepath
+        self.jars_filepath = jars_filepath
+        self.snapshot_filepath = snapshot_filepath
+        self.top_k = top_k
+        self.catalog = None
+        self.mod_search = None
+
+    def open(self):
+        """
+        Load the catalog and search indexes now, instead of on the first query.
+        """
+        # NumPy-backed modules are only imported once a query actually needs them
+        from search import ModSearch
+        from snapshot import open_snapshot
+
+        snapshot = open_snapshot(self.names_filepath, self.jars_filepath, self.snapshot_filepath)
+        self.catalog = snapshot.catalog
+        self.mod_search = ModSearch(snapshot.search_index("names"), snapshot.search_index("jars"), top_k=self.top_k)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Find the mods matching a query, best first.
+
+        Args:
+            query (str): The search query, as typed into the search bar.
+            limit (int): Maximum number of results, or None for all of them.
+
+        Returns:
+            list: The matching ModInfo objects.
+        """
+        if self.mod_search is None:
+            self.open()
+        matched = self.mod_search.search(query)
+        if limit is not None:
+            matched = matched[:limit]
+        return [self.catalog[index] for index in matched.tolist()]
+
+    def find(self, name):
+        """
+        Look up a mod by name, ignoring case, spaces and punctuation.
+
+        Args:
+            name (str): The mod name.
+
+        Returns:
+            ModInfo: The first mod with that name, or None.
+        """
+        if self.catalog is None:
+            self.open()
+        return self.catalog.find(name)
+
+
+def mod_to_dict(mod):
+    return {"name": mod.name, "jar": mod.jar, "loader": mod.loader, "version": mod.version, "mc_version": mod.mc_version}
+
+
+def format_text(query, mods, batch):
+    lines = [f"# {query}"] if batch else []
+    if not mods:
+        lines.append("(no matches)")
+    width = max((len(mod.name) for mod in mods), default=0)
+    lines.extend(f"{mod.name:<{width}}  {mod.jar}" for mod in mods)
+    return "\n".join(lines)
+
+
+def format_json(query, mods):
+    return json.dumps({"query": query, "results": [mod_to_dict(mod) for mod in mods]})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Search the mod list from the command line, without opening the window.",
+        epilog="With no query arguments, queries are read from stdin, one per line.",
+    )
+    parser.add_argument("queries", nargs="*", help="Queries to run (e.g. sodium)")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per query")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Results per query (0 for all)")
+    parser.add_argument("--names", default=MOD_NAMES_FILE, help="Mod names file")
+    parser.add_argument("--jars", default=MOD_JARS_FILE, help="Mod jar file names file")
+    parser.add_argument("--snapshot", default=CATALOG_SNAPSHOT, help="Catalog snapshot file")
+    parser.add_argument("--timing", action="store_true", help="Report the load and query times on stderr")
+    args = parser.parse_args()
+    if args.limit < 0:  # A negative slice would drop results from the end
+        parser.error(f"--limit must be a non-negative integer, not {args.limit}")
+
+    start = time.perf_counter()
+    mod_query = ModQuery(args.names, args.jars, args.snapshot)
+    queries = args.queries or (line.strip() for line in sys.stdin if line.strip())
+    batch = len(args.queries) != 1
+    first_result = None
+
+    for query in queries:
+        mods = mod_query.search(query, limit=args.limit or None)
+        if first_result is None:
+            first_result = time.perf_counter()
+        print(format_json(query, mods) if args.json else format_text(query, mods, batch), flush=not args.queries)
+
+    if args.timing and first_result is not None:
+        print(f"First result after {1000 * (first_result - start):.1f} ms, "
+              f"all after {1000 * (time.perf_counter() - start):.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+import argparse
+import gc
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout clean for the JSON output
+import pygame
+
+TRACE_MAGIC = b"FQLTRACE"
+TRACE_VERSION = 1
+REPLAY_RATE = 60  # Frames per simulated second during a replay
+REPLAY_TAIL = 1.0  # Seconds replayed after the last event, so animations settle
+
+# File layout: header, then one fixed-size record per event
+HEADER = struct.Struct("<8sIIq")  # magic, version, event count, seed
+EVENT = struct.Struct("<fBhhiHI")  # seconds since the start, type, a, b, key or button, mod, unicode code point
+
+# Recorded event types and their codes; a and b hold the position for mouse
+# motion and buttons, and the wheel x/y for the mouse wheel
+EVENT_CODES = {
+    pygame.MOUSEMOTION: 1,
+    pygame.MOUSEBUTTONDOWN: 2,
+    pygame.MOUSEBUTTONUP: 3,
+    pygame.MOUSEWHEEL: 4,
+    pygame.KEYDOWN: 5,
+    pygame.KEYUP: 6,
+}
+EVENT_TYPES = {code: event_type for event_type, code in EVENT_CODES.items()}
+
+
+def encode_event(timestamp, event):
+    """
+    Pack an input event into a trace record.
+
+    Args:
+        timestamp (float): Seconds since the recording started.
+        event (pygame.event.Event): A MOUSEMOTION, MOUSEBUTTON*, MOUSEWHEEL or KEY* event.
+
+    Returns:
+        bytes: The packed record.
+    """
+    code = EVENT_CODES[event.type]
+    if event.type == pygame.MOUSEWHEEL:
+        a, b, key = event.x, event.y, 0
+    elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
+        a, b, key = 0, 0, event.key
+    else:
+        (a, b), key = event.pos, getattr(event, "button", 0)
+    mod = getattr(event, "mod", 0) & 0xFFFF
+    unicode = getattr(event, "unicode", "")
+    return EVENT.pack(timestamp, code, a, b, key, mod, ord(unicode[0]) if unicode else 0)
+
+
+def decode_event(record):
+    """
+    Unpack a trace record.
+
+    Args:
+        record (bytes): A record written by encode_event.
+
+    Returns:
+        tuple: (timestamp, pygame.event.Event).
+    """
+    timestamp, code, a, b, key, mod, unicode = EVENT.unpack(record)
+    event_type = EVENT_TYPES[code]
+    if event_type == pygame.MOUSEWHEEL:
+        event = pygame.event.Event(event_type, x=a, y=b)
+    elif event_type in (pygame.KEYDOWN, pygame.KEYUP):
+        event = pygame.event.Event(event_type, key=key, mod=mod, unicode=chr(unicode) if unicode else "")
+    elif event_type == pygame.MOUSEMOTION:
+        event = pygame.event.Event(event_type, pos=(a, b))
+    else:
+        event = pygame.event.Event(event_type, pos=(a, b), button=key)
+    return timestamp, event
+
+
+class InputRecorder:
+    def __init__(self, seed):
+        """
+        Record the input events the main loop handles, with timestamps.
+
+        Args:
+            seed (int): The seed the session's textures and particles were generated with,
+                stored in the trace so a replay looks the same.
+        """
+        self.seed = seed
+        self.records = []
+        self.start = None
+
+    def capture(self, events):
+        """
+        Record the input events of a frame; other event types are ignored.
+
+        Args:
+            events (list): The events the frame handles.
+        """
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        for event in events:
+            if event.type in EVENT_CODES:
+                self.records.append(encode_event(now - self.start, event))
+
+    def save(self, filepath):
+        """
+        Write the trace.
+
+        Args:
+            filepath (str): Path to the trace file.
+        """
+        with open(filepath, "wb") as trace_file:
+            trace_file.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, len(self.records), self.seed))
+            trace_file.write(b"".join(self.records))
+
+
+def load_trace(filepath):
+    """
+    Read a recorded trace.
+
+    Args:
+        filepath (str): Path to the trace file.
+
+    Returns:
+        tuple: (seed, list of (timestamp, pygame.event.Event) in recording order).
+    """
+    with open(filepath, "rb") as trace_file:
+        data = trace_file.read()
+    magic, version, count, seed = HEADER.unpack_from(data)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        raise ValueError(f"{filepath} is not an input trace this version can replay")
+    events = [
+        decode_event(data[offset:offset + EVENT.size])
+        for offset in range(HEADER.size, HEADER.size + count * EVENT.size, EVENT.size)
+    ]
+    return seed, events
+
+
+class InputReplayer:
+    def __init__(self, events, frame_time):
+        """
+        Feed a recorded trace back into the main loop, frame by frame.
+
+        Every event is posted before the frame whose simulated time span
+        contains its timestamp, so a replay at a fixed frame time is the
+        same on every run. The dummy video driver has no real pointer or
+        keyboard, so the pointer position and key modifiers are virtual.
+
+        Args:
+            events (list): (timestamp, pygame.event.Event) tuples, as returned by load_trace.
+            frame_time (float): Simulated seconds per frame.
+        """
+        self.frame_time = frame_time
+        self.schedule = {}  # Frame -> events posted before it
+        for timestamp, event in events:
+            self.schedule.setdefault(max(1, math.ceil(timestamp / frame_time)), []).append(event)
+        self.last_frame = max(self.schedule, default=0)
+        self.mouse_pos = (0, 0)
+        self.key_mods = 0
+
+    def install(self):
+        """
+        Route pygame's pointer position and key modifiers to the replayed ones.
+        """
+        pygame.mouse.get_pos = lambda: self.mouse_pos
+        pygame.key.get_mods = lambda: self.key_mods
+
+    def post(self, frame):
+        """
+        Post the events due before a frame.
+
+        Args:
+            frame (int): Number of frames finished so far.
+        """
+        for event in self.schedule.get(frame, ()):
+            if hasattr(event, "pos"):
+                self.mouse_pos = event.pos
+            if hasattr(event, "mod"):
+                self.key_mods = event.mod
+            pygame.event.post(event)
+
+
+def summarize_counts(samples):
+    """
+    Summarize per-frame counts.
+    """
+    if not samples:
+        return {"mean": 0.0, "p50": 0, "p95": 0, "max": 0}
+    ordered = sorted(samples)
+    return {
+        "mean": round(sum(ordered) / len(ordered), 1),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+def replay(trace_filepath, rate=REPLAY_RATE, trace_allocations=False):
+    """
+    Replay a trace headlessly and measure every frame.
+
+    The simulation advances exactly 1/rate seconds per frame and searches
+    are waited for, so the same trace produces the same frames on every
+    run; frames are rendered as fast as possible and timed.
+
+    Args:
+        trace_filepath (str): Path to the recorded trace.
+        rate (int): Simulated frames per second.
+        trace_allocations (bool): Also measure the memory allocated within each frame with
+            tracemalloc (slows every frame down, so compare such runs only with each other).
+
+    Returns:
+        dict: Frame times, per-stage times, allocation counts and a digest of the last frame.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    import main as app
+    from benchmark import StageTimer, peak_rss_mb, summarize
+    from particles import ParticleSystem
+    from ui_elements import Button, SearchBar
+
+    seed, events = load_trace(trace_filepath)
+    replayer = InputReplayer(events, 1 / rate)
+    replayer.install()
+    frames = replayer.last_frame + int(REPLAY_TAIL * rate)
+
+    timer = StageTimer()
+    timer.wrap(ParticleSystem, "update", "particles")
+    timer.wrap(ParticleSystem, "draw", "particles")
+    timer.wrap(Button, "draw", "buttons")
+    timer.wrap(SearchBar, "draw", "search_bar")
+    timer.wrap(pygame.display, "update", "flip")
+    timer.wrap(pygame.display, "flip", "flip")
+
+    if trace_allocations:
+        import tracemalloc
+        tracemalloc.start()
+
+    blocks = []  # Net allocated blocks per frame
+    allocated = []  # KB allocated within each frame (tracemalloc only)
+    state = {"last": None, "blocks": None, "digest": None}
+    gc_before = [generation["collections"] for generation in gc.get_stats()]
+
+    def on_frame(frame):
+        now = time.perf_counter()
+        current_blocks = sys.getallocatedblocks()
+        if state["last"] is not None:
+            timer.end_frame(now - state["last"])
+            blocks.append(current_blocks - state["blocks"])
+            if trace_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                allocated.append(round((peak - state["traced"]) / 1024))
+        timer.current = {}
+        if trace_allocations:
+            tracemalloc.reset_peak()
+            state["traced"] = tracemalloc.get_traced_memory()[0]
+
+        if frame == frames:
+            # Identical traces on identical builds end on identical pixels
+            state["digest"] = hashlib.sha1(pygame.image.tobytes(pygame.display.get_surface(), "RGB")).hexdigest()
+        replayer.post(frame)
+
+        state["blocks"] = sys.getallocatedblocks()
+        state["last"] = time.perf_counter()
+
+    app.main(max_frames=frames, frame_rate=0, on_frame=on_frame, seed=seed, frame_time=1 / rate)
+
+    stages = ("total", "particles", "buttons", "search_bar", "flip")
+    result = {
+        "trace": os.path.basename(trace_filepath),
+        "events": len(events),
+        "frames": frames,
+        "rate": rate,
+        "frame_ms": {stage: summarize([frame.get(stage, 0.0) for frame in timer.frames]) for stage in stages},
+        "allocated_blocks": summarize_counts(blocks),
+        "gc_collections": [
+            generation["collections"] - before for generation, before in zip(gc.get_stats(), gc_before)
+        ],
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "final_frame_sha1": state["digest"],
+    }
+    if trace_allocations:
+        result["allocated_kb"] = summarize_counts(allocated)
+    return result
+
+
+def compare(current, baseline, tolerance):
+    """
+    Compare a replay against one of the same trace on another build.
+
+    Args:
+        current (dict): Results from replay.
+        baseline (dict): Earlier results from replay.
+        tolerance (float): Allowed increase, as a fraction of the baseline.
+
+    Returns:
+        list: One (metric, baseline, current) tuple per regression.
+    """
+    from benchmark import REGRESSION_FLOOR
+
+    def metrics(result):
+        for stage, summary in result["frame_ms"].items():
+            yield f"frame_ms.{stage}.mean", summary["mean"], REGRESSION_FLOOR
+            yield f"frame_ms.{stage}.p95", summary["p95"], REGRESSION_FLOOR
+        yield "allocated_blocks.p95", result["allocated_blocks"]["p95"], 10
+        yield "gc_collections.gen0", result["gc_collections"][0], 2
+        if "allocated_kb" in result:
+            yield "allocated_kb.mean", result["allocated_kb"]["mean"], 1
+
+    previous = {name: value for name, value, _ in metrics(baseline)}
+    regressions = []
+    for name, value, floor in metrics(current):
+        before = previous.get(name)
+        if before is not None and value > before * (1 + tolerance) and value - before > floor:
+            regressions.append((name, before, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record input sessions and replay them headlessly for performance runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Run the app and record its input until the window is closed")
+    record.add_argument("trace", help="Trace file to write")
+    record.add_argument("--seed", type=int, help="Seed for textures and particles (default: random)")
+    play = commands.add_parser("play", help="Replay a trace headlessly and report frame times and allocations")
+    play.add_argument("trace", help="Trace file to replay")
+    play.add_argument("--rate", type=int, default=REPLAY_RATE, help="Simulated frames per second")
+    play.add_argument("--tracemalloc", action="store_true", help="Also measure memory allocated per frame (slower)")
+    play.add_argument("--output", help="Write the results as JSON to this file (default: stdout)")
+    play.add_argument("--baseline", help="Compare against a replay of the same trace stored in this file")
+    play.add_argument("--tolerance", type=float, default=0.25, help="Allowed increase (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    trace_filepath = os.path.abspath(args.trace)
+    output_filepath = os.path.abspath(args.output) if getattr(args, "output", None) else None
+    baseline_filepath = os.path.abspath(args.baseline) if getattr(args, "baseline", None) else None
+
+    # Asset paths in main.py are relative to the repository
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if args.command == "record":
+        import main as app
+        app.main(seed=args.seed, record_filepath=trace_filepath)
+        return
+
+    results = replay(trace_filepath, rate=args.rate, trace_allocations=args.tracemalloc)
+    if output_filepath:
+        with open(output_filepath, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if baseline_filepath:
+        with open(baseline_filepath) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("final_frame_sha1") != results["final_frame_sha1"]:
+            print("The last frame differs from the baseline: the builds behave differently", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before} -> {after}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import write_mod_data
+from file_cache import FileCache, list_jars
+from hashing import JarHasher, find_conflicts, find_duplicates, write_report
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    tomllib = None
+
+FABRIC_METADATA = "fabric.mod.json"
+FORGE_METADATA = ("META-INF/mods.toml", "META-INF/neoforge.mods.toml")
+MANIFEST = "META-INF/MANIFEST.MF"
+CACHE_VERSION = 2
+MIN_PARALLEL_JARS = 16  # Below this, starting worker processes costs more than it saves
+
+# Fallback for Pythons without tomllib: `key = "value"` / `key = '''value'''` lines
+TOML_VALUE_PATTERN = re.compile(r"""(?m)^\s*(\w+)\s*=\s*(?:'''(.*?)'''|\"\"\"(.*?)\"\"\"|"((?:[^"\\]|\\.)*)"|'([^']*)')""", re.S)
+
+
+def _read_fabric(data):
+    metadata = json.loads(data.decode("utf-8-sig"), strict=False)  # Some mods put raw newlines in strings
+    return metadata.get("id"), metadata.get("name"), metadata.get("version"), metadata.get("description")
+
+
+def _read_forge(data, jar):
+    text = data.decode("utf-8-sig", errors="replace")
+    if tomllib is not None:
+        try:
+            mods = tomllib.loads(text).get("mods") or [{}]
+            mod = mods[0]
+        except tomllib.TOMLDecodeError:
+            mod = None
+    else:
+        mod = None
+    if mod is None:
+        # Only look at the first [[mods]] table
+        block = text.split("[[mods]]", 1)[-1].split("[[", 1)[0]
+        mod = {match.group(1): next(group for group in match.groups()[1:] if group is not None)
+               for match in TOML_VALUE_PATTERN.finditer(block)}
+
+    version = mod.get("version")
+    if version == "${file.jarVersion}":
+        # The real version lives in the jar manifest
+        version = None
+        try:
+            for line in jar.read(MANIFEST).decode("utf-8", errors="replace").splitlines():
+                if line.startswith("Implementation-Version:"):
+                    version = line.split(":", 1)[1].strip()
+        except KeyError:
+            pass
+    return mod.get("modId"), mod.get("displayName"), version, mod.get("description")
+
+
+def read_jar_metadata(jar_path):
+    """
+    Read the mod id, name, version and description from a jar.
+
+    Only the central directory and the metadata entry are read, never
+    the rest of the jar.
+
+    Args:
+        jar_path (str): Path to the jar file.
+
+    Returns:
+        dict: The "id", "name", "version" and "description" (each may be None),
+            and the "loader" the metadata belongs to, or None if the jar has none.
+    """
+    mod_id = name = version = description = loader = None
+    try:
+        with zipfile.ZipFile(jar_path) as jar:
+            entries = set(jar.namelist())
+            if FABRIC_METADATA in entries:
+                mod_id, name, version, description = _read_fabric(jar.read(FABRIC_METADATA))
+                loader = "fabric"
+            else:
+                for entry in FORGE_METADATA:
+                    if entry in entries:
+                        mod_id, name, version, description = _read_forge(jar.read(entry), jar)
+                        loader = "neoforge" if entry.startswith("META-INF/neoforge") else "forge"
+                        break
+    except (OSError, zipfile.BadZipFile, ValueError, KeyError, IndexError, AttributeError, StopIteration):
+        pass  # Unreadable or malformed jar: fall back to the filename
+
+    def clean(value):
+        # One line per mod in the text files
+        return " ".join(value.split()) if isinstance(value, str) and value.strip() else None
+
+    return {
+        "id": clean(mod_id),
+        "name": clean(name),
+        "version": clean(version),
+        "description": clean(description),
+        "loader": loader,
+    }
+
+
+def display_name(jar, metadata):
+    """
+    Get the name to list a scanned jar under: its mod name, its mod id, or its filename.
+    """
+    return metadata["name"] or metadata["id"] or os.path.splitext(jar)[0]
+
+
+class ModScanner:
+    def __init__(self, cache_filepath=None, max_workers=None):
+        """
+        Initialize the mods folder scanner.
+
+        Jars are read in a pool of worker processes, and the results are
+        cached on disk by (path, size, mtime), so a rescan only opens the
+        jars that were added or changed since the last one.
+
+        Args:
+            cache_filepath (str): Path to the JSON scan cache, or None to disable caching.
+            max_workers (int): Number of worker processes, or None for one per CPU.
+        """
+        self.cache = FileCache(cache_filepath, version=CACHE_VERSION)
+        self.max_workers = max_workers
+        self.scanned = 0  # Jars actually opened during the last scan
+
+    def scan(self, directory):
+        """
+        Scan a mods folder.
+
+        Args:
+            directory (str): The folder holding the mod jars.
+
+        Returns:
+            list: (jar_filename, metadata) tuples, sorted by filename.
+        """
+        jars = list_jars(directory)
+        metadata = {path: self.cache.get(path, size, mtime_ns) for path, (size, mtime_ns) in jars.items()}
+
+        changed = [path for path, value in metadata.items() if value is None]
+        if len(changed) >= MIN_PARALLEL_JARS and self.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                chunksize = max(1, len(changed) // ((self.max_workers or os.cpu_count() or 1) * 4))
+                results = list(executor.map(read_jar_metadata, changed, chunksize=chunksize))
+        else:
+            results = [read_jar_metadata(path) for path in changed]
+        self.scanned = len(changed)
+
+        for path, value in zip(changed, results):
+            metadata[path] = value
+            self.cache.put(path, *jars[path], value)
+        self.cache.prune(directory, jars)
+        self.cache.save()
+
+        return sorted(
+            ((os.path.basename(path), value) for path, value in metadata.items()),
+            key=lambda item: item[0].lower(),
+        )
+
+    def load_mod_data(self, directory):
+        """
+        Scan a mods folder into the structure `catalog.load_mod_data` returns.
+
+        Args:
+            directory (str): The folder holding the mod jars.
+
+        Returns:
+            list: A list of tuples where each tuple contains (mod_name, mod_jar).
+        """
+        return [(display_name(jar, metadata), jar) for jar, metadata in self.scan(directory)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the mod names and mod jar files from a mods folder.")
+    parser.add_argument("directory", help="The mods folder to scan")
+    parser.add_argument("--names", default="data/mod_names.txt", help="Mod names file to write")
+    parser.add_argument("--jars", default="data/mod_jar.txt", help="Mod jar file names file to write")
+    parser.add_argument("--cache", default="data/scan_cache.json", help="Scan cache file")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--hash-cache", default="data/hash_cache.json", help="Jar digest cache file")
+    parser.add_argument("--report", default="data/mod_report.json", help="Duplicate and conflict report to write")
+    args = parser.parse_args()
+
+    scanner = ModScanner(args.cache, max_workers=args.workers)
+    scanned = scanner.scan(args.directory)
+    mod_data = [(display_name(jar, metadata), jar) for jar, metadata in scanned]
+    write_mod_data(mod_data, args.names, args.jars)
+    print(f"{len(mod_data)} mods ({scanner.scanned} jars read, {len(mod_data) - scanner.scanned} cached)")
+
+    # Byte-identical copies and the same mod in different versions
+    hasher = JarHasher(args.hash_cache)
+    duplicates = find_duplicates(hasher.hash_folder(args.directory))
+    conflicts = find_conflicts((jar, metadata["id"], metadata["version"]) for jar, metadata in scanned)
+    write_report(args.report, duplicates, conflicts)
+    print(f"{hasher.hashed} jars hashed, {len(duplicates)} duplicates, {len(conflicts)} conflicts")
+    for jars in duplicates:
+        print(f"  duplicate: {', '.join(jars)}")
+    for mod_id, jars in conflicts.items():
+        print(f"  conflict ({mod_id}): {', '.join(jars)}")
+
+
+if __name__ == "__main__":
+    main()
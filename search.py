@@ -0,0 +1,413 @@
+import queue
+import threading
+
+import numpy as np
+
+# Match scoring
+MATCH_SCORE = 1.0  # Every matched character
+CONTIGUOUS_BONUS = 5.0  # Character directly follows the previous match
+WORD_START_BONUS = 8.0  # Character starts a word ("Sodium Extra", "sodium-extra", "SodiumExtra")
+PREFIX_BONUS = 10.0  # Match starts at the very beginning of the text
+GAP_START_PENALTY = 3.0  # Characters skipped between two matched characters...
+GAP_PENALTY = 1.0  # ...plus this per skipped character after the first, so scattered matches rank below tight ones
+LENGTH_PENALTY = 0.05  # Per character of text, so shorter texts win ties
+
+
+class SearchIndex:
+    def __init__(self, texts, max_history=64):
+        """
+        Build a scored subsequence search index over a list of texts.
+
+        Texts are lowercased once, and every character gets a sorted table of
+        the (text, position) pairs it occurs at. A query is matched one
+        character at a time over every place the character can go, keeping
+        the best score of an alignment ending at each position, so a text is
+        scored by its best alignment (the contiguous word match in "Better
+        End", not the scattered first letters), all in vectorized binary
+        searches. Results for earlier queries are kept on a stack: typing
+        reuses the previous result set, and backspace pops back to it.
+
+        Args:
+            texts (list): The texts to search (mod names or jar names), in catalog order.
+            max_history (int): Maximum number of cached result sets.
+        """
+        lowered = [text.lower() for text in texts]
+        self.max_history = max_history
+        self.all = np.arange(len(lowered), dtype=np.int64)
+        self.lengths = np.array([len(text) for text in lowered], dtype=np.float64)
+        self.stride = 1
+
+        self.positions = {}  # char -> sorted keys of text_id * stride + position
+        self.word_starts = {}  # char -> whether each of those positions starts a word
+        if lowered:
+            self._build_position_table(lowered, texts)
+        self._reset_history()
+
+    def _reset_history(self):
+        # (query, keys where an alignment can end, best score ending there, matching texts, their best scores)
+        self.history = [("", None, None, self.all, np.zeros(len(self.all)))]
+
+    def tables(self):
+        """
+        Export the position tables as flat arrays, e.g. to store them in a catalog snapshot.
+
+        Returns:
+            dict: Array name -> numpy.ndarray, accepted by `from_tables`.
+        """
+        chars = sorted(self.positions)
+        return {
+            "stride": np.array([self.stride], dtype=np.int64),
+            "lengths": self.lengths,
+            "chars": np.array([ord(char) for char in chars], dtype=np.uint32),
+            "offsets": np.cumsum([0] + [len(self.positions[char]) for char in chars], dtype=np.int64),
+            "keys": np.concatenate([self.positions[char] for char in chars] or [np.zeros(0, dtype=np.int64)]),
+            "word_starts": np.concatenate([self.word_starts[char] for char in chars] or [np.zeros(0, dtype=bool)]),
+        }
+
+    @classmethod
+    def from_tables(cls, tables, max_history=64):
+        """
+        Restore an index from the arrays produced by `tables`, without rebuilding it.
+
+        The arrays are used as they are (no copies), so they can be views
+        into a memory-mapped file.
+
+        Args:
+            tables (dict): Array name -> numpy.ndarray, as returned by `tables`.
+            max_history (int): Maximum number of cached result sets.
+
+        Returns:
+            SearchIndex: The restored index.
+        """
+        index = cls.__new__(cls)
+        index.max_history = max_history
+        index.lengths = tables["lengths"]
+        index.all = np.arange(len(index.lengths), dtype=np.int64)
+        index.stride = int(tables["stride"][0])
+
+        index.positions, index.word_starts = {}, {}
+        offsets = tables["offsets"].tolist()
+        for i, code in enumerate(tables["chars"].tolist()):
+            char = chr(code)
+            start, end = offsets[i], offsets[i + 1]
+            index.positions[char] = tables["keys"][start:end]
+            index.word_starts[char] = tables["word_starts"][start:end]
+        index._reset_history()
+        return index
+
+    def _build_position_table(self, lowered, texts):
+        # Flatten all texts into one code point array, one separator after each text
+        text = "".join(text + "\0" for text in lowered)
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        separators = codes == 0
+        text_ids = np.cumsum(separators) - separators  # Text each character belongs to
+        starts = np.concatenate(([0], np.flatnonzero(separators)[:-1] + 1))
+        positions = np.arange(len(codes)) - starts[text_ids]
+        self.stride = int(positions.max()) + 2
+
+        # A word starts after anything that isn't a letter or digit, or at a lower-to-upper case change
+        previous = np.concatenate(([0], codes[:-1]))
+        alnum = ((previous >= 97) & (previous <= 122)) | ((previous >= 48) & (previous <= 57)) | (previous > 127)
+        word_starts = (positions == 0) | ~alnum
+        original = "".join(text + "\0" for text in texts)
+        if len(original) == len(text):  # Lowercasing can change the length of some unicode text
+            original_codes = np.frombuffer(original.encode("utf-32-le"), dtype=np.uint32)
+            upper = (original_codes >= 65) & (original_codes <= 90)
+            lower = (original_codes >= 97) & (original_codes <= 122)
+            word_starts |= upper & np.concatenate(([False], lower[:-1]))
+
+        # Per-character position table
+        keys = text_ids.astype(np.int64) * self.stride + positions
+        order = np.argsort(codes, kind="stable")  # Stable, so keys stay sorted within a character
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for group in np.split(order, bounds):
+            code = int(codes[group[0]])
+            if code:
+                char = chr(code)
+                char_keys = keys[group]
+                self.positions[char] = char_keys
+                self.word_starts[char] = word_starts[group]
+
+    def _start(self, char):
+        """
+        Score every occurrence of the first query character as the start of an alignment.
+        """
+        keys = self.positions.get(char)
+        if keys is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return keys, MATCH_SCORE + WORD_START_BONUS * self.word_starts[char] + PREFIX_BONUS * (keys % self.stride == 0)
+
+    def _extend(self, ends, scores, char):
+        """
+        Extend the alignments ending at `ends` (sorted keys) by `char`.
+
+        Every occurrence of `char` after the first alignment end in its text
+        is a candidate; it continues the best alignment ending anywhere
+        before it, less the gap penalty, or the one ending right before it
+        with the contiguous bonus, whichever scores higher.
+
+        Returns:
+            tuple: (keys, scores) of the extended alignments, sorted by key.
+        """
+        keys = self.positions.get(char)
+        if keys is None or not len(ends):
+            return ends[:0], scores[:0]
+
+        # Group the alignment ends by text
+        texts = ends // self.stride
+        boundaries = np.concatenate(([True], texts[1:] != texts[:-1]))
+        group_starts = np.flatnonzero(boundaries)
+        group = np.cumsum(boundaries) - 1
+
+        # Gather the occurrences of char after the first alignment end of each text
+        low = np.searchsorted(keys, ends[group_starts] + 1)
+        high = np.searchsorted(keys, (texts[group_starts] + 1) * self.stride)
+        counts = high - low
+        total = int(counts.sum())
+        if not total:
+            return ends[:0], scores[:0]
+        found = np.arange(total) + np.repeat(low - (np.cumsum(counts) - counts), counts)
+        found_keys = keys[found]
+
+        # Best score of an alignment ending anywhere before each occurrence, less the gap in between.
+        # The gap penalty is linear in the end position, so this is a running max per text
+        # over score + GAP_PENALTY * end.
+        gap_scores = scores + GAP_PENALTY * ends
+        offset = group * (gap_scores.max() - gap_scores.min() + 1)  # Keeps each text's running max from leaking into the next
+        best_before = np.maximum.accumulate(gap_scores + offset) - offset
+        new_scores = best_before[np.searchsorted(ends, found_keys) - 1]
+        new_scores -= GAP_PENALTY * (found_keys - 1) + GAP_START_PENALTY - GAP_PENALTY
+
+        # Or continue the alignment ending right before it, contiguously
+        adjacent = np.minimum(np.searchsorted(ends, found_keys - 1), len(ends) - 1)
+        contiguous = ends[adjacent] == found_keys - 1
+        np.maximum(new_scores, np.where(contiguous, scores[adjacent] + CONTIGUOUS_BONUS, -np.inf), out=new_scores)
+
+        new_scores += MATCH_SCORE + WORD_START_BONUS * self.word_starts[char][found]
+        return found_keys, new_scores
+
+    def search_scored(self, query):
+        """
+        Find and score the texts that contain the query as a (case-insensitive) subsequence.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            tuple: (indices, scores) of the matching texts, in catalog order; each scored by its best alignment.
+        """
+        query = query.lower()
+
+        # Pop back to the longest cached query that this one extends
+        while not query.startswith(self.history[-1][0]):
+            self.history.pop()
+        cached_query, ends, scores, indices, best = self.history[-1]
+
+        for length in range(len(cached_query) + 1, len(query) + 1):
+            if length == 1:
+                ends, scores = self._start(query[0])
+            else:
+                ends, scores = self._extend(ends, scores, query[length - 1])
+
+            # Best alignment of every text
+            texts = ends // self.stride
+            group_starts = np.flatnonzero(np.concatenate(([True], texts[1:] != texts[:-1]))) if len(ends) else ends[:0]
+            indices = texts[group_starts]
+            best = np.maximum.reduceat(scores, group_starts) if len(ends) else scores[:0]
+            self.history.append((query[:length], ends, scores, indices, best))
+        if len(self.history) > self.max_history:
+            del self.history[1:len(self.history) - self.max_history + 1]
+
+        return indices, best - LENGTH_PENALTY * self.lengths[indices]
+
+    def search(self, query):
+        """
+        Find the texts that contain the query as a (case-insensitive) subsequence.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            numpy.ndarray: Indices of the matching texts, in catalog order.
+        """
+        if not query.strip():
+            return self.all  # Show everything if the query is empty
+        return self.search_scored(query)[0]
+
+
+class ModSearch:
+    def __init__(self, names, jars, top_k=200, jar_weight=0.8):
+        """
+        Ranked fuzzy search over the mod names and jar filenames.
+
+        Args:
+            names (list or SearchIndex): The mod names in catalog order, or a prebuilt index over them.
+            jars (list or SearchIndex): The jar filenames in catalog order, or a prebuilt index over them.
+            top_k (int): Number of best matches that are ranked by score.
+            jar_weight (float): Weight of a jar filename match relative to a name match.
+        """
+        self.names = names if isinstance(names, SearchIndex) else SearchIndex(names)
+        self.jars = jars if isinstance(jars, SearchIndex) else SearchIndex(jars)
+        self.top_k = top_k
+        self.jar_weight = jar_weight
+        self.count = len(self.names.all)
+
+    def scores(self, query):
+        """
+        Score every mod against the query.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            numpy.ndarray: The best score of each mod, -inf where neither its name nor its jar matches.
+        """
+        combined = np.full(self.count, -np.inf)
+        name_indices, name_scores = self.names.search_scored(query)
+        combined[name_indices] = name_scores
+        jar_indices, jar_scores = self.jars.search_scored(query)
+        combined[jar_indices] = np.maximum(combined[jar_indices], jar_scores * self.jar_weight)
+        return combined
+
+    def search(self, query):
+        """
+        Find the mods matching the query, best first.
+
+        The top_k best matches are ordered by score; the remaining matches
+        follow in catalog order, so ranking cost stays bounded.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            numpy.ndarray: Indices of the matching mods, in display order.
+        """
+        if not query.strip():
+            return self.names.all  # Show all mods if the query is empty
+
+        scores = self.scores(query)
+        candidates = np.flatnonzero(scores > -np.inf)
+        if len(candidates) > self.top_k:
+            # Partial selection of the best k, then sort only those
+            best = candidates[np.argpartition(-scores[candidates], self.top_k - 1)[:self.top_k]]
+        else:
+            best = candidates
+        best = best[np.lexsort((best, -scores[best]))]  # By score, then catalog order
+
+        rest = np.ones(self.count, dtype=bool)
+        rest[best] = False
+        return np.concatenate((best, candidates[rest[candidates]]))
+
+
+class SearchWorker:
+    def __init__(self, search, debounce=0.03):
+        """
+        Run searches on a background thread so matching never blocks a frame.
+
+        Queries are debounced, and each one gets a generation number; results
+        for anything but the newest query are dropped. Finished results wait
+        in a queue until the main loop polls them.
+
+        Args:
+            search (callable): Maps a query to the matching indices (e.g. ModSearch.search).
+            debounce (float): Seconds a query must stay unchanged before it is searched.
+        """
+        self.search = search
+        self.debounce = debounce
+        self.condition = threading.Condition()
+        self.results = queue.Queue()
+        self.generation = 0  # Generation of the newest submitted query
+        self.applied_generation = 0  # Generation of the newest result handed out
+        self.finished_generation = 0  # Generation of the newest result queued
+        self.pending = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="search-worker", daemon=True)
+        self.thread.start()
+
+    @property
+    def searching(self):
+        """
+        Whether a submitted query has not produced its result yet.
+        """
+        return self.generation != self.applied_generation
+
+    def submit(self, query):
+        """
+        Queue a query, superseding any query that has not finished yet.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            int: The generation number of the query.
+        """
+        with self.condition:
+            self.generation += 1
+            self.pending = query
+            self.condition.notify_all()
+            return self.generation
+
+    def wait(self, timeout=None):
+        """
+        Block until the newest query has its result queued, for runs that must be deterministic.
+
+        Args:
+            timeout (float): Seconds to wait at most, or None to wait as long as it takes.
+
+        Returns:
+            bool: False if the timeout ran out first.
+        """
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.stopped or self.finished_generation == self.generation, timeout)
+
+    def poll(self):
+        """
+        Get the newest finished result, if any. Never blocks.
+
+        Returns:
+            tuple: (generation, query, result), or None if nothing new is ready.
+        """
+        latest = None
+        while True:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == self.generation:
+                latest = item
+        if latest is not None:
+            self.applied_generation = latest[0]
+        return latest
+
+    def stop(self):
+        """
+        Stop the worker thread.
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+
+                # Debounce: wait until no newer query arrives for a moment
+                generation = None
+                while not self.stopped and generation != self.generation:
+                    generation = self.generation
+                    self.condition.wait(self.debounce)
+                if self.stopped:
+                    return
+                query, self.pending = self.pending, None
+
+            result = self.search(query)
+
+            # Drop the result if a newer query arrived while searching
+            if generation == self.generation:
+                self.results.put((generation, query, result))
+                with self.condition:
+                    self.finished_generation = generation
+                    self.condition.notify_all()
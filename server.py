@@ -0,0 +1,289 @@
+import argparse
+import hashlib
+import http.client
+import json
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from flask import Flask, Response, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from query import CATALOG_SNAPSHOT, DEFAULT_LIMIT, MOD_JARS_FILE, MOD_NAMES_FILE, ModQuery, mod_to_dict
+
+SERVER_HOST = "127.0.0.1"  # Local tools only
+SERVER_PORT = 8765
+RESULT_CACHE_SIZE = 1024  # Encoded responses kept before evicting the least recently used
+BENCHMARK_REQUESTS = 2000  # Requests per benchmark phase
+
+
+class ResultCache:
+    def __init__(self, max_entries=RESULT_CACHE_SIZE):
+        """
+        Initialize an LRU cache of encoded responses.
+
+        Args:
+            max_entries (int): Maximum number of responses kept before evicting.
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (etag, body)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Get a cached response, marking it as recently used.
+
+        Returns:
+            tuple: (etag, body), or None if it is not cached.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        """
+        Cache a response, evicting the least recently used ones over the limit.
+        """
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class SearchService:
+    def __init__(self, mod_query, cache_size=RESULT_CACHE_SIZE):
+        """
+        Answer search and lookup requests from one shared catalog and matcher.
+
+        Responses are encoded once and cached with their ETag, so a repeated
+        request costs a dictionary lookup and a revalidation (If-None-Match)
+        costs no body at all. The matcher keeps per-query history and is not
+        thread-safe, so cache misses take turns on it.
+
+        Args:
+            mod_query (ModQuery): The catalog and matcher, opened on first use.
+            cache_size (int): Maximum number of cached responses.
+        """
+        self.mod_query = mod_query
+        self.cache = ResultCache(cache_size)
+        self.search_lock = threading.Lock()
+
+    def _encode(self, document):
+        body = json.dumps(document).encode()
+        return hashlib.sha1(body).hexdigest()[:20], body
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Get the encoded search results for a query.
+
+        Args:
+            query (str): The search query, as typed into the search bar.
+            limit (int): Maximum number of results, or None for all of them.
+
+        Returns:
+            tuple: (etag, body) of the JSON response.
+        """
+        key = ("search", query, limit)
+        entry = self.cache.get(key)
+        if entry is None:
+            with self.search_lock:
+                mods = self.mod_query.search(query, limit=limit)
+            entry = self._encode({"query": query, "results": [mod_to_dict(mod) for mod in mods]})
+            self.cache.put(key, entry)
+        return entry
+
+    def mod(self, name):
+        """
+        Get the encoded entry for a mod, looked up by name.
+
+        Args:
+            name (str): The mod name, ignoring case, spaces and punctuation.
+
+        Returns:
+            tuple: (etag, body) of the JSON response, or None if there is no such mod.
+        """
+        key = ("mod", name)
+        entry = self.cache.get(key)
+        if entry is None:
+            with self.search_lock:
+                mod = self.mod_query.find(name)
+            if mod is None:
+                return None
+            entry = self._encode(mod_to_dict(mod))
+            self.cache.put(key, entry)
+        return entry
+
+
+def create_app(service):
+    """
+    Create the Flask app serving the search API.
+
+    Routes:
+        /search?q=<query>&limit=<n>: Matching mods, best first (limit 0 for all).
+        /mods/<name>: A single mod, looked up by name.
+        /stats: Result cache counters.
+
+    Args:
+        service (SearchService): Answers the requests.
+
+    Returns:
+        flask.Flask: The app.
+    """
+    app = Flask(__name__)
+
+    def respond(entry):
+        etag, body = entry
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"  # Clients may keep results, but revalidate each time
+        return response
+
+    @app.get("/search")
+    def search():
+        limit = request.args.get("limit", str(DEFAULT_LIMIT))
+        if not limit.isdecimal():  # Also rejects negative limits, which would slice from the end
+            return {"error": f"limit must be a non-negative integer, not {limit!r}"}, 400
+        limit = int(limit)
+        return respond(service.search(request.args.get("q", ""), limit=limit or None))
+
+    @app.get("/mods/<path:name>")
+    def mod(name):
+        entry = service.mod(name)
+        if entry is None:
+            return {"error": f"No mod named {name!r}"}, 404
+        return respond(entry)
+
+    @app.get("/stats")
+    def stats():
+        return service.cache.stats()
+
+    return app
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"  # Persistent connections, so the benchmark measures requests rather than handshakes
+
+    def log_request(self, *args, **kwargs):
+        pass  # One line per request would be most of the benchmark's cost
+
+
+def benchmark_queries(catalog, count):
+    # Keystroke-like prefixes of the mod names, in catalog order
+    queries = OrderedDict()
+    for mod in catalog:
+        lowered = mod.name.lower()
+        for length in range(2, min(len(lowered), 8) + 1):
+            queries[lowered[:length]] = None
+    return list(queries)[:count]
+
+
+def run_benchmark(service, requests=BENCHMARK_REQUESTS):
+    """
+    Measure request throughput with a local client over a persistent connection.
+
+    Three phases over the same queries: cache misses (each query once, on
+    an empty cache), cache hits (the queries again, round robin), and
+    revalidations (If-None-Match with the stored ETag). There are at most as
+    many distinct queries as the cache holds, so the hit phase never evicts.
+
+    Args:
+        service (SearchService): The service to benchmark; its cache is cleared first.
+        requests (int): Requests per hit and revalidation phase.
+
+    Returns:
+        dict: Per phase, requests per second and latency percentiles in milliseconds.
+    """
+    service.mod_query.open()
+    unique_queries = benchmark_queries(service.mod_query.catalog, min(requests, service.cache.max_entries))
+    repeated_queries = (unique_queries * (requests // len(unique_queries) + 1))[:requests]
+    service.cache.clear()
+
+    server = make_server(SERVER_HOST, 0, create_app(service), request_handler=KeepAliveRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, name="search-server", daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection(SERVER_HOST, server.port)
+    etags = {}
+
+    def run_phase(queries, revalidate):
+        latencies = []
+        start = time.perf_counter()
+        for query in queries:
+            headers = {"If-None-Match": etags[query]} if revalidate else {}
+            sent = time.perf_counter()
+            connection.request("GET", "/search?" + urlencode({"q": query}), headers=headers)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - sent)
+            etags[query] = response.getheader("ETag")
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        return {
+            "requests_per_second": round(len(queries) / elapsed),
+            "p50_ms": round(1000 * statistics.median(latencies), 3),
+            "p95_ms": round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 3),
+            "status": response.status,
+        }
+
+    try:
+        results = {
+            "catalog_size": len(service.mod_query.catalog),
+            "unique_queries": len(unique_queries),
+            "miss": run_phase(unique_queries, revalidate=False),
+            "hit": run_phase(repeated_queries, revalidate=False),
+            "not_modified": run_phase(repeated_queries, revalidate=True),
+            "cache": service.cache.stats(),
+        }
+    finally:
+        connection.close()
+        server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the mod list as a local JSON search API.")
+    parser.add_argument("--host", default=SERVER_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port to listen on")
+    parser.add_argument("--cache-size", type=int, default=RESULT_CACHE_SIZE, help="Cached responses before evicting")
+    parser.add_argument("--names", default=MOD_NAMES_FILE, help="Mod names file")
+    parser.add_argument("--jars", default=MOD_JARS_FILE, help="Mod jar file names file")
+    parser.add_argument("--snapshot", default=CATALOG_SNAPSHOT, help="Catalog snapshot file")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=BENCHMARK_REQUESTS, metavar="REQUESTS",
+                        help="Measure throughput with a local client instead of serving")
+    args = parser.parse_args()
+
+    service = SearchService(ModQuery(args.names, args.jars, args.snapshot), cache_size=args.cache_size)
+    if args.benchmark:
+        print(json.dumps(run_benchmark(service, args.benchmark), indent=2))
+        return
+
+    service.mod_query.open()  # Load before listening, so the first request is as fast as the rest
+    create_app(service).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
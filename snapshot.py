@@ -0,0 +1,306 @@
+import hashlib
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from catalog import ModCatalog, ModInfo, load_mod_data
+from search import SearchIndex
+
+SNAPSHOT_MAGIC = b"MODSNAP\0"
+SNAPSHOT_VERSION = 2
+
+# Per-mod string fields, in ModInfo constructor order
+FIELDS = ("name", "jar", "slug", "version", "mc_version", "loader", "normalized")
+
+# magic, format version, mod count, section count,
+# (size, mtime_ns) of the names file, (size, mtime_ns) of the jars file, SHA-1 of both files
+HEADER = struct.Struct("<8sIIIqqqq20s")
+# section name, numpy dtype, byte offset, item count
+SECTION = struct.Struct("<24s8sQQ")
+ALIGNMENT = 8  # Sections start on 8-byte boundaries so arrays can be mapped in place
+
+
+def source_stamp(filepaths):
+    """
+    Get the size and modification time of the source files.
+
+    Args:
+        filepaths (tuple): The mod names and mod jar file paths.
+
+    Returns:
+        tuple: (size, mtime_ns) of every file, flattened.
+    """
+    stamp = ()
+    for filepath in filepaths:
+        stat = os.stat(filepath)
+        stamp += (stat.st_size, stat.st_mtime_ns)
+    return stamp
+
+
+class SourceWatcher:
+    def __init__(self, filepaths, interval=0.5):
+        """
+        Watch the source files for changes by polling their size and modification time.
+
+        A change is only reported once the files have held still for a
+        poll, so an editor saving both files (or a scan rewriting them) is
+        picked up once, after it finished.
+
+        Args:
+            filepaths (tuple): The mod names and mod jar file paths.
+            interval (float): Seconds between checks; polls in between return right away.
+        """
+        self.filepaths = filepaths
+        self.interval = interval
+        self.stamp = source_stamp(filepaths)  # Stamp of the files as last reported
+        self.pending = None  # Changed stamp waiting to hold still
+        self.checked = time.monotonic()
+
+    def poll(self):
+        """
+        Check whether the files changed since the last reported change.
+
+        Returns:
+            bool: True once per settled change.
+        """
+        now = time.monotonic()
+        if now - self.checked < self.interval:
+            return False
+        self.checked = now
+
+        try:
+            stamp = source_stamp(self.filepaths)
+        except OSError:
+            return False  # A file is being replaced; check again later
+        if stamp == self.stamp:
+            self.pending = None
+            return False
+        if stamp != self.pending:
+            self.pending = stamp  # Still changing
+            return False
+        self.stamp, self.pending = stamp, None
+        return True
+
+
+def source_digest(filepaths, chunk_size=1 << 20):
+    """
+    Hash the contents of the source files.
+
+    Args:
+        filepaths (tuple): The mod names and mod jar file paths.
+        chunk_size (int): Bytes read at a time.
+
+    Returns:
+        bytes: The SHA-1 digest over all files.
+    """
+    digest = hashlib.sha1()
+    for filepath in filepaths:
+        with open(filepath, "rb") as file:
+            while chunk := file.read(chunk_size):
+                digest.update(chunk)
+        digest.update(b"\0")  # Keep file boundaries from shifting between files
+    return digest.digest()
+
+
+def read_header(snapshot_filepath):
+    """
+    Read the header of a snapshot file.
+
+    Returns:
+        tuple: The unpacked header fields, or None if the file is missing or not a current snapshot.
+    """
+    try:
+        with open(snapshot_filepath, "rb") as file:
+            data = file.read(HEADER.size)
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    header = HEADER.unpack(data)
+    if header[0] != SNAPSHOT_MAGIC or header[1] != SNAPSHOT_VERSION:
+        return None
+    return header
+
+
+def write_snapshot(snapshot_filepath, catalog, names_index, jars_index, stamp, digest):
+    """
+    Write a catalog and its search tables to a snapshot file.
+
+    The file is a fixed header, a section table, and one flat array per
+    section. Strings live in a single UTF-8 blob addressed by an offset
+    table, so any record can be decoded without reading the others.
+
+    Args:
+        snapshot_filepath (str): Where to write the snapshot.
+        catalog (ModCatalog): The catalog to store.
+        names_index (SearchIndex): The search index over the mod names.
+        jars_index (SearchIndex): The search index over the jar filenames.
+        stamp (tuple): The source_stamp of the files the catalog was loaded from.
+        digest (bytes): The source_digest of those files.
+    """
+    encoded = []
+    nulls = []
+    for mod in catalog:
+        for field in FIELDS:
+            value = getattr(mod, field)
+            encoded.append(b"" if value is None else value.encode("utf-8"))
+            nulls.append(value is None)
+
+    sections = {
+        "strings": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "string_offsets": np.cumsum([0] + [len(value) for value in encoded], dtype=np.int64),
+        "string_nulls": np.array(nulls, dtype=bool),
+    }
+    for prefix, index in (("names", names_index), ("jars", jars_index)):
+        for name, array in index.tables().items():
+            sections[f"{prefix}.{name}"] = array
+
+    # Lay the sections out after the header and the section table
+    offset = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for name, array in sections.items():
+        offset += -offset % ALIGNMENT
+        array = np.ascontiguousarray(array)
+        sections[name] = array
+        table.append(SECTION.pack(name.encode(), array.dtype.str.encode(), offset, len(array)))
+        offset += array.nbytes
+
+    # Write to a temporary file first, so a crash never leaves a half-written snapshot behind
+    temporary_filepath = snapshot_filepath + ".tmp"
+    with open(temporary_filepath, "wb") as file:
+        file.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(catalog), len(sections), *stamp, digest))
+        file.write(b"".join(table))
+        for array in sections.values():
+            file.write(b"\0" * (-file.tell() % ALIGNMENT))
+            file.write(array.tobytes())
+    os.replace(temporary_filepath, snapshot_filepath)
+
+
+class SnapshotRecords:
+    def __init__(self, snapshot):
+        """
+        A read-only sequence of ModInfo entries decoded from a snapshot on first access.
+
+        Args:
+            snapshot (CatalogSnapshot): The open snapshot.
+        """
+        self.buffer = snapshot.buffer
+        self.count = snapshot.count
+        self.strings_offset = snapshot.offsets["strings"]
+        self.string_offsets = snapshot.arrays["string_offsets"]
+        self.string_nulls = snapshot.arrays["string_nulls"]
+        self.decoded = {}  # index -> ModInfo
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("mod index out of range")
+
+        mod = self.decoded.get(index)
+        if mod is None:
+            first = index * len(FIELDS)
+            bounds = self.string_offsets[first:first + len(FIELDS) + 1].tolist()
+            nulls = self.string_nulls[first:first + len(FIELDS)].tolist()
+            base = self.strings_offset
+            values = [
+                None if null else self.buffer[base + start:base + end].decode("utf-8")
+                for start, end, null in zip(bounds, bounds[1:], nulls)
+            ]
+            mod = self.decoded[index] = ModInfo(index, *values)
+        return mod
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+
+class CatalogSnapshot:
+    def __init__(self, snapshot_filepath):
+        """
+        Open a snapshot file with mmap.
+
+        Only the header and section table are parsed here; the sections are
+        mapped as NumPy arrays without copying, and mod records are decoded
+        when they are first accessed, so opening takes the same time for any
+        catalog size.
+
+        Args:
+            snapshot_filepath (str): Path to the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot in the current format.
+        """
+        with open(snapshot_filepath, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = HEADER.unpack_from(self.buffer)
+        if header[0] != SNAPSHOT_MAGIC or header[1] != SNAPSHOT_VERSION:
+            raise ValueError(f"{snapshot_filepath} is not a version {SNAPSHOT_VERSION} catalog snapshot")
+        self.count, section_count = header[2], header[3]
+
+        self.arrays = {}  # section name -> numpy array backed by the mapping
+        self.offsets = {}  # section name -> byte offset in the file
+        for i in range(section_count):
+            name, dtype, offset, count = SECTION.unpack_from(self.buffer, HEADER.size + i * SECTION.size)
+            name = name.rstrip(b"\0").decode()
+            self.arrays[name] = np.frombuffer(self.buffer, dtype=np.dtype(dtype.rstrip(b"\0").decode()), count=count, offset=offset)
+            self.offsets[name] = offset
+
+        self.catalog = ModCatalog(SnapshotRecords(self))
+
+    def search_index(self, prefix):
+        """
+        Restore one of the stored search indexes.
+
+        Args:
+            prefix (str): "names" or "jars".
+
+        Returns:
+            SearchIndex: The index, backed by the mapped arrays.
+        """
+        start = prefix + "."
+        return SearchIndex.from_tables({
+            name[len(start):]: array for name, array in self.arrays.items() if name.startswith(start)
+        })
+
+
+def open_snapshot(names_filepath, jars_filepath, snapshot_filepath):
+    """
+    Open the catalog snapshot, rebuilding it first if the source files changed.
+
+    The sizes and modification times of the source files are checked
+    first; only if those differ are the files hashed, and the snapshot is
+    rebuilt only if their contents actually changed.
+
+    Args:
+        names_filepath (str): Path to the mod names file.
+        jars_filepath (str): Path to the mod jar file names.
+        snapshot_filepath (str): Path to the snapshot file.
+
+    Returns:
+        CatalogSnapshot: The open, up-to-date snapshot.
+    """
+    sources = (names_filepath, jars_filepath)
+    stamp = source_stamp(sources)
+    header = read_header(snapshot_filepath)
+
+    if header is None or header[4:8] != stamp:
+        digest = source_digest(sources)
+        if header is not None and header[8] == digest:
+            # Touched but unchanged: only refresh the stamp in the header
+            with open(snapshot_filepath, "r+b") as file:
+                file.write(HEADER.pack(*header[:4], *stamp, digest))
+        else:
+            catalog = ModCatalog.from_entries(load_mod_data(names_filepath, jars_filepath))
+            names_index = SearchIndex([mod.name for mod in catalog])
+            jars_index = SearchIndex([mod.jar for mod in catalog])
+            write_snapshot(snapshot_filepath, catalog, names_index, jars_index, stamp, digest)
+
+    return CatalogSnapshot(snapshot_filepath)
@@ -1,6 +1,7 @@
 class ButtonStateManager:
-    def __init__(self, buttons, debug_mode=False):
+    def __init__(self, buttons, debug_mode=False, hit_test=None):
         self.buttons = buttons
+        self.hit_test = hit_test  # Optional fast lookup: (mouse_pos, scroll_offset) -> button or None
         self.debug_mode = debug_mode  # Store the debug mode state
         self.hovered_button = None
         self.mouse_down_on = None
@@ -26,10 +27,13 @@ class ButtonStateManager:
             scroll_offset (int): The current scroll offset.
         """
         self.hovered_button = None
-        for button in self.buttons:
-            if button.is_clicked(mouse_pos, scroll_offset):
-                self.hovered_button = button
-                break
+        if self.hit_test:
+            self.hovered_button = self.hit_test(mouse_pos, scroll_offset)
+        else:
+            for button in self.buttons:
+                if button.is_clicked(mouse_pos, scroll_offset):
+                    self.hovered_button = button
+                    break
 
         # Detect hover state changes
         if self.hovered_button != self.last_hovered_button:
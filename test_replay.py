@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import pygame
+import pytest
+
+from replay import HEADER, TRACE_MAGIC, TRACE_VERSION, encode_event
+
+REPOSITORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_trace(filepath, events, seed=1):
+    with open(filepath, "wb") as trace_file:
+        trace_file.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, len(events), seed))
+        trace_file.write(b"".join(encode_event(timestamp, event) for timestamp, event in events))
+
+
+def final_frame_digest(trace_filepath, dirty_rendering):
+    # One process per replay: pygame is quit at the end of main() and can't be reused
+    code = (
+        "import main, replay; "
+        f"main.DIRTY_RENDERING = {dirty_rendering}; "
+        f"print(replay.replay({str(trace_filepath)!r})['final_frame_sha1'])"
+    )
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPOSITORY, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.mark.parametrize("wheel_steps", [5, 8])
+def test_dirty_rendering_matches_full_redraw(tmp_path, wheel_steps):
+    # Scrolling stops between whole pixels, where dirty rects and buttons must still agree
+    events = [(0.05, pygame.event.Event(pygame.MOUSEMOTION, pos=(300, 400)))]
+    events += [(0.1 + 0.07 * step, pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1)) for step in range(wheel_steps)]
+    trace_filepath = tmp_path / "scroll.trace"
+    write_trace(trace_filepath, events)
+    assert final_frame_digest(trace_filepath, True) == final_frame_digest(trace_filepath, False)
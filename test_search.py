@@ -0,0 +1,31 @@
+from search import ModSearch, SearchIndex
+
+
+def rank(names, query):
+    return [names[index] for index in ModSearch(names, [""] * len(names)).search(query).tolist()]
+
+
+def test_word_match_outranks_scattered_match():
+    names = ["Expandeddelight", "Better End", "Enchantmentdescriptions"]
+    assert rank(names, "end")[0] == "Better End"
+
+
+def test_word_match_later_in_the_text_is_found():
+    # The first "a", "p" and "i" are scattered; the best alignment is the final word
+    index = SearchIndex(["Cardinal Components Api"])
+    _, scattered = SearchIndex(["Cardinal Components Xpxi"]).search_scored("api")
+    _, word = index.search_scored("api")
+    assert word[0] > scattered[0]
+
+
+def test_prefix_match_ranks_first():
+    names = ["Reeses Sodium Options", "Sodium Extra", "Sound Physics Remastered Fabric"]
+    assert rank(names, "sodium")[0] == "Sodium Extra"
+
+
+def test_backspace_reuses_history():
+    index = SearchIndex(["Better End", "Expandeddelight"])
+    first = index.search_scored("end")
+    index.search_scored("endx")
+    again = index.search_scored("end")
+    assert first[0].tolist() == again[0].tolist() and first[1].tolist() == again[1].tolist()
@@ -0,0 +1,88 @@
+import zlib
+
+import numpy as np
+import pygame
+
+# Color palettes for the different block types
+BLOCK_PALETTES = {
+    "dirt": [(134, 96, 67), (115, 76, 50), (155, 110, 75)],  # Dirt shades
+    "grass": [(95, 159, 53), (80, 140, 45), (110, 180, 65)],  # Grass shades
+    "cobblestone": [(120, 120, 120), (100, 100, 100), (140, 140, 140)],  # Cobblestone shades
+}
+DEFAULT_PALETTE = [(200, 200, 200)]  # Default to light gray
+
+
+class BlockTexturePool:
+    def __init__(self, size, variants=8, seed=None, block_size=4):
+        """
+        Initialize a shared pool of procedural block textures.
+
+        Every block type gets a fixed number of pre-generated variants which
+        buttons reference instead of generating a private texture each.
+
+        Args:
+            size (tuple): The size of the textures (width, height).
+            variants (int): Number of variants generated per block type.
+            seed (int): Seed for reproducible textures, or None for random ones.
+            block_size (int): Size of the square pixel blocks.
+        """
+        self.size = (int(size[0]), int(size[1]))
+        self.variants = variants
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % (2 ** 32))
+        self.block_size = block_size
+        self.textures = {}  # block_type -> list of surfaces
+
+        for block_type in BLOCK_PALETTES:
+            self._build(block_type)
+
+    def _build(self, block_type):
+        palette = np.array(BLOCK_PALETTES.get(block_type, DEFAULT_PALETTE), dtype=np.uint8)
+        width, height = self.size
+        blocks_x = -(-width // self.block_size)
+        blocks_y = -(-height // self.block_size)
+
+        surfaces = []
+        for variant in range(self.variants):
+            # Seed per (block type, variant) so each texture is reproducible on its own
+            rng = np.random.default_rng((self.seed, zlib.crc32(block_type.encode()), variant))
+            choices = rng.integers(len(palette), size=(blocks_x, blocks_y))
+
+            # Scale the block grid up to pixels (surfarray is indexed [x, y])
+            pixels = palette[choices]
+            pixels = pixels.repeat(self.block_size, axis=0).repeat(self.block_size, axis=1)
+
+            surface = pygame.Surface(self.size)
+            pygame.surfarray.blit_array(surface, pixels[:width, :height])
+            surfaces.append(surface)
+
+        self.textures[block_type] = surfaces
+        return surfaces
+
+    def get(self, block_type, variant=0):
+        """
+        Get a shared texture for a block type.
+
+        Args:
+            block_type (str): The type of block ("dirt", "grass", "cobblestone").
+            variant (int): Which variant to use, wrapped to the variant count.
+
+        Returns:
+            pygame.Surface: The shared texture. Do not draw onto it.
+        """
+        surfaces = self.textures.get(block_type)
+        if surfaces is None:
+            surfaces = self._build(block_type)
+        return surfaces[variant % self.variants]
+
+    def memory_footprint(self):
+        """
+        Get the memory held by the pooled textures.
+
+        Returns:
+            int: The size of all pixel buffers in bytes.
+        """
+        return sum(
+            surface.get_pitch() * surface.get_height()
+            for surfaces in self.textures.values()
+            for surface in surfaces
+        )
@@ -1,8 +1,158 @@
+import bisect
+import itertools
+import math
 import pygame
 import random
+from collections import OrderedDict, deque
+
+_fonts = {}  # (font_path, size) -> pygame.font.Font, shared by the whole process
+_fitted_sizes = {}  # (text, font_path, largest size, max_width) -> fitted font size
+
+def get_font(font_path, size):
+    """
+    Get a shared font, loading the file only the first time a (path, size) is requested.
+
+    Args:
+        font_path (str): Path to the font file.
+        size (int): The font size.
+
+    Returns:
+        pygame.font.Font: The cached font. Do not change its style.
+    """
+    font = _fonts.get((font_path, size))
+    if font is None:
+        font = _fonts[(font_path, size)] = pygame.font.Font(font_path, size)
+    return font
+
+def fit_font_size(text, font_path, largest, max_width, smallest=9):
+    """
+    Find the largest font size at which the text fits a width.
+
+    Binary-searches the size using only text metrics; results are
+    memoized, so the same text is never fitted twice.
+
+    Args:
+        text (str): The text to fit.
+        font_path (str): Path to the font file.
+        largest (int): The largest size to consider.
+        max_width (int): The available width in pixels.
+        smallest (int): The size used if nothing fits.
+
+    Returns:
+        int: The fitted font size.
+    """
+    key = (text, font_path, largest, max_width)
+    size = _fitted_sizes.get(key)
+    if size is None:
+        low, high = smallest, largest  # Invariant: the answer lies in [low, high]
+        while low < high:
+            middle = (low + high + 1) // 2
+            if get_font(font_path, middle).size(text)[0] <= max_width:
+                low = middle
+            else:
+                high = middle - 1
+        size = _fitted_sizes[key] = low
+    return size
+
+class SpriteCache:
+    def __init__(self, max_entries=256, alpha_levels=16):
+        """
+        Initialize an LRU cache of pre-composited button sprites.
+
+        Args:
+            max_entries (int): Maximum number of sprites kept before evicting.
+            alpha_levels (int): Number of alpha steps sprites are quantized to.
+        """
+        self.max_entries = max_entries
+        self.alpha_step = 255 / alpha_levels
+        self.sprites = OrderedDict()  # (key, hovered, alpha) -> pygame.Surface
+        self.masks = {}  # size -> rounded mask surface
+        self.overlays = {}  # size -> rounded hover highlight surface
+        self.outlines = {}  # size -> rounded warning outline surface
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def quantize(self, alpha):
+        """
+        Snap an alpha value to the cached alpha steps (0 and 255 stay exact).
+        """
+        if alpha >= 255:
+            return 255
+        return int(round(alpha / self.alpha_step) * self.alpha_step)
+
+    def rounded_mask(self, size):
+        """
+        Get the shared rounded-corner mask for a sprite size.
+        """
+        mask = self.masks.get(size)
+        if mask is None:
+            mask = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(mask, (255, 255, 255, 255), mask.get_rect(), border_radius=8)
+            self.masks[size] = mask
+        return mask
+
+    def hover_overlay(self, size):
+        """
+        Get the shared translucent hover highlight for a sprite size.
+        """
+        overlay = self.overlays.get(size)
+        if overlay is None:
+            overlay = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(overlay, (255, 255, 255, 50), overlay.get_rect(), border_radius=8)
+            self.overlays[size] = overlay
+        return overlay
+
+    def warning_outline(self, size):
+        """
+        Get the shared rounded outline that flags a conflicting mod, for a sprite size.
+        """
+        outline = self.outlines.get(size)
+        if outline is None:
+            outline = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(outline, (220, 40, 40, 255), outline.get_rect(), width=3, border_radius=8)
+            self.outlines[size] = outline
+        return outline
+
+    def get(self, key, hovered, alpha, compose):
+        """
+        Get a composited sprite, building and caching it on a miss.
+
+        Args:
+            key (tuple): Identifies the sprite contents (text, texture, size, flagged).
+            hovered (bool): Whether the hover highlight is baked in.
+            alpha (int): The alpha the sprite is drawn at.
+            compose (callable): Builds the fully opaque sprite for a hover state.
+
+        Returns:
+            pygame.Surface: The cached sprite.
+        """
+        alpha = self.quantize(alpha)
+        cache_key = (key, hovered, alpha)
+        sprite = self.sprites.get(cache_key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(cache_key)
+            return sprite
+
+        self.misses += 1
+        if alpha == 255:
+            sprite = compose(hovered)
+        else:
+            sprite = self.get(key, hovered, 255, compose).copy()
+            sprite.set_alpha(alpha)
+
+        self.sprites[cache_key] = sprite
+        while len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+        return sprite
 
 class Button:
-    def __init__(self, text, rect, color, font, text_color, font_path, block_type="dirt",hover_sound=None):
+    def __init__(self, text, rect, color, font, text_color, font_path, block_type="dirt",hover_sound=None, texture=None, sprite_cache=None, flagged=False):
         self.text = text
         self.rect = pygame.Rect(rect)
         self.color = color
@@ -11,9 +161,12 @@ class Button:
         self.font_path = font_path
         self.block_type = block_type
         self.visible = True  # Whether the button is logically visible
-        self.texture = self.generate_block_texture(self.rect.size, self.block_type)  # Cache texture
+        # Use the shared texture if one was given, otherwise generate a private one
+        self.texture = texture if texture is not None else self.generate_block_texture(self.rect.size, self.block_type)
         self.hovered = False  # Track whether the button is being hovered over
         self.hover_sound = hover_sound  # Sound to play on hover
+        self.sprite_cache = sprite_cache if sprite_cache is not None else SpriteCache(max_entries=8)
+        self.flagged = flagged  # Duplicate or conflicting jar, drawn with a warning outline
 
         # Cache rendered text and its dimensions
         self.text_surface = self.font.render(self.text, True, self.text_color)
@@ -28,25 +181,34 @@ class Button:
         self.is_match = True
         self.onscreen_alpha = 255  # 255 if onscreen, 0 if outside
 
+        # Shared animation arrays this button reads its position and alpha from, if bound
+        self.state = None
+        self.slot = None
+
+    def bind_state(self, state, slot):
+        """
+        Read the position and alpha from shared animation arrays instead of this button's attributes.
+
+        Args:
+            state (mod_list.ButtonStates): The arrays.
+            slot (int): This button's row in them.
+        """
+        self.state = state
+        self.slot = slot
+        self.rect.y = int(state.draw_y[slot])
+
     def render_text_to_fit(self):
         """
         Shrink text if it's too big to fit inside the button width.
         """
         max_width = self.rect.width - 20  # Leave some margin
-        font_size = self.font.get_height()
-        font_path = self.font_path
-
-        # Start with existing font
-        current_font = self.font
-        temp_surface = current_font.render(self.text, True, self.text_color)
+        if self.font.size(self.text)[0] <= max_width:
+            return  # Already fits at the current size
 
-        while font_size >= 10 and temp_surface.get_width() > max_width:
-            font_size -= 1
-            current_font = pygame.font.Font(font_path, font_size)
-            temp_surface = current_font.render(self.text, True, self.text_color)
-
-        self.font = current_font
-        self.text_surface = temp_surface
+        # Try sizes below the current one, measuring only, then render once
+        font_size = fit_font_size(self.text, self.font_path, self.font.get_height() - 1, max_width)
+        self.font = get_font(self.font_path, font_size)
+        self.text_surface = self.font.render(self.text, True, self.text_color)
         self.text_rect = self.text_surface.get_rect(center=self.rect.center)
 
     def generate_block_texture(self, size, block_type):
@@ -96,66 +258,247 @@ class Button:
         adjusted_rect = self.rect.move(0, -scroll_offset)
         return adjusted_rect.collidepoint(mouse_pos)
     
+    def compose(self, hovered):
+        """
+        Composite the rounded, textured and labelled button at full opacity.
+
+        Args:
+            hovered (bool): Whether to include the hover highlight.
+
+        Returns:
+            pygame.Surface: The composited button.
+        """
+        size = self.rect.size
+        button_surface = pygame.Surface(size, pygame.SRCALPHA)
+
+        # Draw the background texture first, then cut the rounded corners
+        button_surface.blit(self.texture, (0, 0))
+        button_surface.blit(self.sprite_cache.rounded_mask(size), (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+
+        # Draw hover effect if needed
+        if hovered:
+            button_surface.blit(self.sprite_cache.hover_overlay(size), (0, 0))
+
+        # Outline duplicate or conflicting mods
+        if self.flagged:
+            button_surface.blit(self.sprite_cache.warning_outline(size), (0, 0))
+
+        # Draw text on top
+        button_surface.blit(self.text_surface, self.text_surface.get_rect(center=(size[0] // 2, size[1] // 2)))
+        return button_surface
+
     def draw(self, window, hovered=False, scroll_offset=0):
-        if not self.visible:
+        if self.state is not None:
+            # Position and alpha are animated in the shared arrays
+            self.rect.y = int(self.state.draw_y[self.slot])
+            self.alpha = int(self.state.alpha[self.slot])
+        else:
+            if not self.visible:
+                return
+
+            # --- NEW --- Update alpha for this frame
+            self.alpha = min(self.search_alpha, self.onscreen_alpha)
+        if self.alpha <= 0:
             return
 
-        # --- NEW --- Update alpha for this frame
-        self.alpha = min(self.search_alpha, self.onscreen_alpha)
-        
         # Adjust position based on scroll
-        adjusted_rect = self.rect.move(0, -scroll_offset)
-
+        top = self.rect.y - scroll_offset
         visible_margin = 100
-        if adjusted_rect.bottom < (70 - visible_margin) or adjusted_rect.top > (700 + visible_margin):
+        if top + self.rect.height < (70 - visible_margin) or top > (700 + visible_margin):
             return
 
-        # Create a surface for the button
-        button_surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        # Blit the cached sprite for this hover state and alpha. The key holds the texture itself
+        # (surfaces hash by identity), so a freed texture's id can never be reused for a cached sprite
+        sprite = self.sprite_cache.get(
+            (self.text, self.texture, self.rect.size, self.flagged), hovered, self.alpha, self.compose
+        )
+        window.blit(sprite, (self.rect.x, top))
 
-        # Draw the background texture first (no alpha yet)
-        button_surface.blit(self.texture, (0, 0))
+class TextField:
+    def __init__(self, font, color=(255, 255, 255), max_undo=100):
+        """
+        Initialize the editable text model behind the search bar.
 
-        # Create a rounded mask
-        mask_surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
-        pygame.draw.rect(mask_surface, (255, 255, 255, 255), mask_surface.get_rect(), border_radius=8)
+        Glyph advances are cached per character and summed into a
+        prefix-width array, so the x-position of any cursor index is a
+        lookup. Only the visible slice of the text is rendered, and that
+        surface is cached until the text or the slice changes. Undo history
+        is bounded, and runs of typing or deleting are stored as one entry.
 
-        # Apply the rounded mask
-        button_surface.blit(mask_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        Args:
+            font (pygame.font.Font): The font the text is drawn with.
+            color (tuple): The text color.
+            max_undo (int): Maximum number of undo entries kept.
+        """
+        self.font = font
+        self.color = color
+        self.text = ""
+        self.cursor = 0
+        self.anchor = 0  # Other end of the selection; equal to cursor when nothing is selected
+        self.undo_stack = deque(maxlen=max_undo)  # (text, cursor) before each edit
+        self.last_edit = None  # "type" or "delete" while consecutive edits are coalesced
+
+        self.glyph_widths = {}  # char -> advance in pixels
+        self.advances = []  # Advance of every character in the text
+        self._prefix_widths = [0]  # Width of text[:i] for every i; rebuilt lazily after edits
+        self._prefix_dirty = False
+        self._slice_key = None  # (text, first, last) the cached slice surface was rendered for
+        self._slice_surface = None
+
+    # --- Editing ---
+
+    @property
+    def selection(self):
+        """
+        The selected range as (start, end), empty when start == end.
+        """
+        return (self.anchor, self.cursor) if self.anchor <= self.cursor else (self.cursor, self.anchor)
+
+    def _advance(self, char):
+        width = self.glyph_widths.get(char)
+        if width is None:
+            metrics = self.font.metrics(char)[0]
+            width = metrics[4] if metrics else self.font.size(char)[0]  # Missing glyphs have no metrics
+            self.glyph_widths[char] = width
+        return width
+
+    def _replace(self, start, end, text, kind):
+        # Coalesce runs of typing (or deleting) into the undo entry that started them
+        if kind is None or kind != self.last_edit:
+            self.undo_stack.append((self.text, self.cursor))
+        self.last_edit = kind
+
+        self.text = self.text[:start] + text + self.text[end:]
+        self.advances[start:end] = [self._advance(char) for char in text]
+        self._prefix_dirty = True
+        self.cursor = self.anchor = start + len(text)
+
+    def insert(self, text):
+        """
+        Insert text at the cursor, replacing the selection.
 
-        # NOW apply alpha fade to the entire button surface
-        faded_surface = button_surface.copy()
-        faded_surface.set_alpha(self.alpha)
+        Args:
+            text (str): The typed character or pasted text.
+        """
+        text = "".join(text.split("\n"))  # Single line
+        if not text:
+            return  # Keys without a character (Shift, Ctrl, ...) and empty pastes don't edit, not even the selection
+        start, end = self.selection
+        typing = len(text) == 1 and start == end
+        self._replace(start, end, text, "type" if typing else None)
+
+    def backspace(self):
+        """
+        Delete the selection, or the character before the cursor.
+        """
+        start, end = self.selection
+        if start != end:
+            self._replace(start, end, "", None)
+        elif self.cursor > 0:
+            self._replace(self.cursor - 1, self.cursor, "", "delete")
 
-        # Blit the faded button onto the window
-        window.blit(faded_surface, adjusted_rect.topleft)
+    def move(self, delta, extend=False):
+        """
+        Move the cursor.
 
-        # Draw hover effect if needed
-        if hovered:
-            hover_surface = pygame.Surface(adjusted_rect.size, pygame.SRCALPHA)
-            pygame.draw.rect(hover_surface, (255, 255, 255, 50), hover_surface.get_rect(), border_radius=8)
-            window.blit(hover_surface, adjusted_rect.topleft)
+        Args:
+            delta (int): Characters to move by, negative for left.
+            extend (bool): Whether to extend the selection instead of clearing it.
+        """
+        self.cursor = max(0, min(len(self.text), self.cursor + delta))
+        if not extend:
+            self.anchor = self.cursor
+        self.last_edit = None
+
+    def select_all(self):
+        """
+        Select the whole text, with the cursor at the end.
+        """
+        self.anchor, self.cursor = 0, len(self.text)
+        self.last_edit = None
+
+    def undo(self):
+        """
+        Restore the text as it was before the last edit (or run of typing).
+        """
+        if self.undo_stack:
+            text, cursor = self.undo_stack.pop()
+            self.text = text
+            self.advances = [self._advance(char) for char in text]
+            self._prefix_dirty = True
+            self.cursor = self.anchor = cursor
+            self.last_edit = None
+
+    # --- Layout and drawing ---
+
+    @property
+    def prefix_widths(self):
+        """
+        Width of text[:i] for every cursor index i.
+        """
+        if self._prefix_dirty:
+            self._prefix_widths = [0, *itertools.accumulate(self.advances)]
+            self._prefix_dirty = False
+        return self._prefix_widths
+
+    def width(self):
+        """
+        Get the width of the whole text in pixels.
+        """
+        return self.prefix_widths[-1]
+
+    def cursor_x(self):
+        """
+        Get the x-position of the cursor relative to the start of the text.
+        """
+        return self.prefix_widths[self.cursor]
+
+    def render_slice(self, offset, visible_width):
+        """
+        Render the characters that overlap a horizontal window of the text.
+
+        Args:
+            offset (int): Left edge of the window, relative to the start of the text.
+            visible_width (int): Width of the window.
+
+        Returns:
+            tuple: (surface, x) where x is the surface's position relative to the window.
+        """
+        widths = self.prefix_widths
+        first = max(0, bisect.bisect_right(widths, offset) - 1)
+        last = min(len(self.text), bisect.bisect_left(widths, offset + visible_width))
+        key = (self.text, first, last)
+        if key != self._slice_key:
+            self._slice_surface = self.font.render(self.text[first:last], True, self.color)
+            self._slice_key = key
+        return self._slice_surface, widths[first] - offset
 
-        # Draw text (also faded with the button)
-        if self.alpha > 0:
-            text_surface_with_alpha = self.text_surface.copy()
-            text_surface_with_alpha.set_alpha(self.alpha)
-            text_rect = text_surface_with_alpha.get_rect(center=adjusted_rect.center)
-            window.blit(text_surface_with_alpha, text_rect)
 
 class SearchBar:
-    def __init__(self, rect, font, icon_path, extend_sound=None):
+    def __init__(self, rect, font, icon_path, extend_sound=None, icon=None):
+        """
+        Initialize the search bar.
+
+        Args:
+            rect (tuple): Position and collapsed size of the bar.
+            font (pygame.font.Font): Font for the query.
+            icon_path (str): Path to the magnifying glass icon, or None if the icon is set later.
+            extend_sound (pygame.mixer.Sound): Played when the bar expands.
+            icon (pygame.Surface): The icon already loaded and scaled to 30x30, or None to load icon_path.
+        """
         self.rect = pygame.Rect(rect)
         self.font = font
 
         # Animation properties
         self.target_width = self.rect.width  # Target width for animation
         self.animation_speed = 10  # Base speed of expansion/contraction
-        self.easing_factor = 0.2  # Easing factor for smooth animation
+        self.easing_rate = 51.3  # The remaining width shrinks by a factor of e every 1/easing_rate seconds
 
         # Icon properties
-        self.icon = pygame.image.load(icon_path)
-        self.icon = pygame.transform.scale(self.icon, (30, 30))  # Scale the icon
+        if icon is None and icon_path is not None:
+            icon = pygame.image.load(icon_path).convert_alpha()  # Display format, so blits take the fast path
+            icon = pygame.transform.scale(icon, (30, 30))  # Scale the icon
+        self.icon = icon
         self.icon_rect = pygame.Rect(self.rect.x + 10, self.rect.centery - 16, 32, 32)
 
         # State properties
@@ -170,6 +513,12 @@ class SearchBar:
         # Sound assignment
         self.extend_sound = extend_sound  # Sound to play when extending
 
+        # The query being edited
+        self.field = TextField(font)
+
+        # Shown while a search is still running
+        self.searching_surface = self.font.render("...", True, (180, 180, 180))
+
     def toggle(self):
         """
         Toggle the search bar between expanded and collapsed states.
@@ -182,28 +531,37 @@ class SearchBar:
             self.target_width = 50  # Expand to 600px or collapse to 50px
 
 
-    def update(self):
+    def is_animating(self):
+        """
+        Check whether the search bar is still expanding or collapsing.
+        """
+        return self.rect.width != self.target_width
+
+    def update(self, dt):
         """
         Update the search bar's width for smooth animation.
+
+        Args:
+            dt (float): Length of the simulation step, in seconds.
         """
         # Smoothly animate the width toward the target width
         width_difference = self.target_width - self.rect.width
-        if abs(width_difference) > 1:  # Only animate if there's a significant difference
-            self.rect.width += width_difference * self.easing_factor
+        step = int(width_difference * (1 - math.exp(-self.easing_rate * dt)))  # Rect widths are whole pixels
+        if step:  # Only animate while a step still moves the bar
+            self.rect.width += step
         else:
             self.rect.width = self.target_width  # Snap to target width when close enough
 
         # Update the icon position to stay aligned
         self.icon_rect.x = self.rect.x + self.padding
 
-    def draw(self, window, search_query, cursor_position):
+    def draw(self, window, searching=False):
         """
         Draw the search bar and its contents.
 
         Args:
             window (pygame.Surface): The surface to draw on.
-            search_query (str): The current search query.
-            cursor_position (int): The position of the cursor in the query.
+            searching (bool): Whether results for the query are still being searched.
         """
         # Draw the search bar background
         if self.rect.width >= 50:
@@ -213,10 +571,11 @@ class SearchBar:
 
             # Blit the semi-transparent background onto the main window
             window.blit(search_bg, (self.rect.x, self.rect.y))
-        # Always draw the magnifying glass icon
-        icon_x = self.rect.x + self.padding
-        icon_y = self.rect.y + (self.rect.height - self.icon.get_height()) // 2
-        window.blit(self.icon, (icon_x, icon_y))
+        # Always draw the magnifying glass icon (once it has loaded)
+        if self.icon is not None:
+            icon_x = self.rect.x + self.padding
+            icon_y = self.rect.y + (self.rect.height - self.icon.get_height()) // 2
+            window.blit(self.icon, (icon_x, icon_y))
 
         # Only draw the text if the search bar is expanded enough
         if self.rect.width > 80:
@@ -226,36 +585,39 @@ class SearchBar:
 
             # Calculate the visible text area
             visible_width = self.rect.width - (self.icon_rect.width + self.padding * 3)
-            text_surface = self.font.render(search_query, True, (255, 255, 255))
+            field = self.field
 
             # Handle text scrolling if it's too long
-            text_width = text_surface.get_width()
-            if text_width > visible_width:
+            if field.width() > visible_width:
                 # Scroll the text to keep the cursor visible
-                cursor_offset = self.font.size(search_query[:cursor_position])[0]
+                cursor_offset = field.cursor_x()
                 if cursor_offset - self.text_offset > visible_width:
                     self.text_offset = cursor_offset - visible_width
                 elif cursor_offset < self.text_offset:
                     self.text_offset = cursor_offset
-
-                # Clip the text to the visible area
-                text_surface = text_surface.subsurface((self.text_offset, 0, visible_width, text_surface.get_height()))
             else:
                 self.text_offset = 0  # Reset scrolling if text fits
 
-            # Draw the text
-            window.blit(text_surface, (text_x, text_y))
+            # Draw only the characters in view, clipped to the visible area
+            text_surface, slice_x = field.render_slice(self.text_offset, visible_width)
+            previous_clip = window.get_clip()
+            window.set_clip(pygame.Rect(text_x, self.rect.y, visible_width, self.rect.height).clip(previous_clip))
+            window.blit(text_surface, (text_x + slice_x, text_y))
+            window.set_clip(previous_clip)
 
             # Draw blinking cursor
             if self.cursor_visible:
-                pre_cursor_width = self.font.size(search_query[:cursor_position])[0] - self.text_offset
-                cursor_x = text_x + pre_cursor_width
+                cursor_x = text_x + field.cursor_x() - self.text_offset
                 pygame.draw.line(
                     window, (255, 255, 255),
                     (cursor_x, text_y),
-                    (cursor_x, text_y + text_surface.get_height()), 2
+                    (cursor_x, text_y + self.font.get_height()), 2
                 )
 
+            # Show that results are still on their way
+            if searching:
+                window.blit(self.searching_surface, (self.rect.right - self.padding - self.searching_surface.get_width(), text_y))
+
 class Scrollbar:
     def __init__(self, rect, total_content_height, visible_height):
         """
@@ -274,8 +636,13 @@ class Scrollbar:
     def draw(self, window, scroll_offset):
         pygame.draw.rect(window, (100, 100, 100), self.rect)  # Background bar
 
-        # Calculate thumb height
-        thumb_height = max(40, self.visible_height / self.total_content_height * self.rect.height)
+        # Nothing to scroll through (e.g. the mod list was reloaded empty): no thumb to draw or drag
+        if self.total_content_height <= 0:
+            self.thumb_rect.height = 0
+            return
+
+        # Calculate thumb height, filling the bar when everything fits
+        thumb_height = max(40, min(1, self.visible_height / self.total_content_height) * self.rect.height)
         self.thumb_rect.height = thumb_height
 
         max_scroll = self.total_content_height - self.visible_height